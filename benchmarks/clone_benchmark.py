@@ -0,0 +1,47 @@
+import argparse
+import copy
+import random
+import time
+
+from engine.simulation.runner import SimulationRunner, quiet_logging
+from engine.ai.random_policy import RandomPolicy
+from benchmarks.synthetic_catalog import synthetic_catalog
+
+
+def mid_game_engine(seed: int = 0, commands: int = 12):
+    """
+    A game a few turns in, so hands, boards and attachments are populated.
+    """
+    runner = SimulationRunner(synthetic_catalog(), seed=seed)
+    rng = random.Random(seed)
+    engine = runner.new_game(rng)
+    policy = RandomPolicy(rng)
+    for _ in range(commands):
+        if engine.state.game_over:
+            break
+        engine.apply(policy.choose(engine, engine.state.current_player))
+    return engine
+
+
+def clones_per_second(clone, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            clone()
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure GameState clones per second")
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with quiet_logging():
+        engine = mid_game_engine()
+        state = engine.state
+        print(f"GameState.clone:   {clones_per_second(state.clone, args.seconds):>12,.0f} clones/s")
+        print(f"GameEngine.clone:  {clones_per_second(engine.clone, args.seconds):>12,.0f} clones/s")
+        print(f"copy.deepcopy:     {clones_per_second(lambda: copy.deepcopy(state), args.seconds):>12,.0f} clones/s")
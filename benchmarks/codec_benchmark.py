@@ -0,0 +1,31 @@
+import argparse
+import json
+
+from engine.codec import decode_state, encode_state
+from engine.simulation.runner import quiet_logging
+from benchmarks.clone_benchmark import clones_per_second, mid_game_engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the binary state encoding with JSON snapshots")
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with quiet_logging():
+        engine = mid_game_engine()
+        state = engine.state
+        registry = state.cards.registry
+        encoded = encode_state(state)
+        snapshot_json = json.dumps(engine.snapshot())
+
+        def fresh_snapshot():
+            # Bypass the snapshot cache so every call serializes the state
+            engine._snapshot = None
+            engine._player_views = {}
+            return json.dumps(engine.snapshot())
+
+        print(f"encode_state size:  {len(encoded):>12,} bytes")
+        print(f"json snapshot size: {len(snapshot_json):>12,} bytes")
+        print(f"encode_state:       {clones_per_second(lambda: encode_state(state), args.seconds):>12,.0f} ops/s")
+        print(f"decode_state:       {clones_per_second(lambda: decode_state(encoded, registry), args.seconds):>12,.0f} ops/s")
+        print(f"json snapshot:      {clones_per_second(fresh_snapshot, args.seconds):>12,.0f} ops/s")
@@ -0,0 +1,180 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.ai.random_policy import RandomPolicy
+from engine.rules.actions import PLAY_STAR, action_command, decode_action, legal_actions
+from engine.rules.event_ops import resolve_contest
+from engine.setup import build_card_table, build_decks, build_players, deal_starting_hands
+from engine.simulation.runner import SimulationRunner, quiet_logging
+from benchmarks.clone_benchmark import mid_game_engine
+from benchmarks.synthetic_catalog import synthetic_catalog
+
+# Times the engine's hot paths on the fixed synthetic catalog and prints
+# JSON: ops/s and per-op percentiles for each case. Save one run with
+# --output and pass it as --baseline to a later run to see the ratio
+# against it; the exit status is 1 if any case got slower than --threshold.
+
+SUITE_VERSION = 1
+
+
+def percentile(sorted_times: List[float], fraction: float) -> float:
+    index = min(len(sorted_times) - 1, max(0, round(fraction * len(sorted_times)) - 1))
+    return sorted_times[index]
+
+
+def measure(run: Callable[[Any], Any], setup: Optional[Callable[[int], Any]] = None,
+            seconds: float = 1.0, warmup: int = 5, max_samples: int = 1_000_000) -> Dict[str, Any]:
+    """
+    Time run(setup(i)) once per sample for about `seconds` of run time.
+    setup() is not timed, so every sample can start from fresh state.
+    """
+    for i in range(warmup):
+        run(setup(i) if setup is not None else None)
+
+    times: List[float] = []
+    clock = time.perf_counter
+    spent = 0.0
+    i = warmup
+    while spent < seconds and len(times) < max_samples:
+        argument = setup(i) if setup is not None else None
+        start = clock()
+        run(argument)
+        elapsed = clock() - start
+        times.append(elapsed)
+        spent += elapsed
+        i += 1
+
+    times.sort()
+    return {
+        "samples": len(times),
+        "ops_per_sec": len(times) / spent,
+        "mean_us": spent / len(times) * 1e6,
+        "p50_us": percentile(times, 0.50) * 1e6,
+        "p90_us": percentile(times, 0.90) * 1e6,
+        "p99_us": percentile(times, 0.99) * 1e6,
+    }
+
+
+def benchmark_cases() -> Dict[str, Dict[str, Callable]]:
+    """
+    Case name -> {"run": ..., "setup": ...}. Every case is seeded, so runs
+    on the same code see the same games.
+    """
+    catalog = synthetic_catalog()
+    registry = catalog.registry()
+    runner = SimulationRunner(catalog, seed=0)
+
+    def build(i: int):
+        cards = build_card_table(catalog, registry)
+        return build_decks(catalog, cards, random.Random(i))
+
+    def undealt(i: int):
+        return build_players(), build(i)[0]
+
+    engine = mid_game_engine()
+    state = engine.state
+    stat = state.cards[state.event_deck.cards[state.event_deck.cursor]].stat_options[0]
+
+    # Positions where the player to move has a star to play, so every
+    # timed dispatch is an accepted PLAY_CARD
+    positions = []
+    game_index = 0
+    while len(positions) < 32:
+        rng = random.Random(game_index)
+        game = runner.new_game(rng)
+        policy = RandomPolicy(rng)
+        while not game.state.game_over and len(positions) < 32:
+            player_index = game.state.current_player
+            stars = [a for a in legal_actions(game.state, player_index) if decode_action(a)[0] == PLAY_STAR]
+            if stars:
+                positions.append((game, action_command(stars[0], game.state, player_index)))
+                game = game.clone()
+            game.apply(policy.choose(game, player_index))
+        game_index += 1
+
+    def fresh_position(i: int):
+        game, command = positions[i % len(positions)]
+        return game.clone(), command
+
+    def fresh_snapshot(_):
+        # Bypass the snapshot cache so every call serializes the state
+        engine._snapshot = None
+        engine._player_views = {}
+        engine.snapshot()
+
+    return {
+        "build_decks": {"run": build, "setup": lambda i: i},
+        "deal_starting_hands": {"run": lambda args: deal_starting_hands(*args), "setup": undealt},
+        "dispatch_play_card": {"run": lambda args: args[0].dispatch(args[1]), "setup": fresh_position},
+        "snapshot": {"run": fresh_snapshot, "setup": None},
+        "snapshot_cached": {"run": lambda _: engine.snapshot(), "setup": None},
+        "resolve_contest": {"run": lambda _: resolve_contest(state.players, stat, state.cards), "setup": None},
+        "full_game": {"run": runner.play_game, "setup": lambda i: i},
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """
+    Each case's ops/s against the baseline's; a ratio below 1 - threshold
+    is a regression.
+    """
+    comparison = {}
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        comparison[name] = {
+            "baseline_ops_per_sec": base["ops_per_sec"],
+            "ratio": ratio,
+            "regressed": ratio < 1 - threshold,
+        }
+    return comparison
+
+
+def run_suite(seconds: float = 1.0, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    with quiet_logging():
+        cases = benchmark_cases()
+        unknown = set(only or ()) - set(cases)
+        if unknown:
+            raise ValueError(f"Unknown benchmark cases: {', '.join(sorted(unknown))}")
+        results = {
+            name: measure(case["run"], case["setup"], seconds)
+            for name, case in cases.items()
+            if not only or name in only
+        }
+    return {
+        "suite_version": SUITE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seconds": seconds,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time Star Power's hot paths on a fixed synthetic catalog")
+    parser.add_argument("--seconds", type=float, default=1.0, help="timed run time per case")
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="run only these cases")
+    parser.add_argument("--output", help="also write the results to this file, e.g. to use as a baseline")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="slowdown against the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    report = run_suite(args.seconds, args.only)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report["results"], json.load(f), args.threshold)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if any(case["regressed"] for case in report.get("comparison", {}).values()):
+        sys.exit(1)
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List
+from utils.card_loader import CATALOG_SHEETS, CachedSpreadsheet, CardCatalog, load_catalog
+
+TAGS = ("Pop", "Rapper", "DJ", "Rock")
+STATS = ("Aura", "Talent", "Influence", "Legacy")
+
+
+def synthetic_rows(star_count: int = 40, power_count: int = 8) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fixed worksheet rows shaped like the real sheets, so benchmarks run
+    without Google Sheets access and always see the same cards.
+    """
+    stars = [
+        {
+            "Name": f"Star {i}",
+            "Aura": 1 + (i * 7) % 9,
+            "Talent": 1 + (i * 5) % 9,
+            "Influence": 1 + (i * 3) % 9,
+            "Legacy": 1 + (i * 11) % 9,
+            "Tags": TAGS[i % len(TAGS)],
+        }
+        for i in range(star_count)
+    ]
+    powers = [
+        {
+            "Name": f"Power {i}",
+            "Type": "Modify Stat",
+            "Description": "",
+            "Aura Mod": (i % 3) - 1,
+            "Talent Mod": (i % 4),
+            "Influence Mod": 1 if i % 2 else 0,
+            "Legacy Mod": 2 if i % 5 == 0 else 0,
+        }
+        for i in range(power_count)
+    ]
+    events = [{"Name": f"{stat} Showdown", "Type": "Stat Contest", "Stat Options": stat} for stat in STATS]
+    events += [
+        {"Name": "Talent Show", "Type": "Stat Contest", "Stat Options": "Aura, Talent"},
+        {"Name": "Hall of Fame", "Type": "Stat Contest", "Stat Options": "Influence, Legacy"},
+        {"Name": "Award Night", "Type": "Stat Contest", "Stat Options": ", ".join(STATS)},
+    ]
+    fans = [{"Name": f"{tag} Fan", "Bonus": 1, "Tag": tag} for tag in TAGS]
+    fans += [{"Name": f"{tag} Superfan", "Bonus": 2, "Tag": tag} for tag in TAGS]
+    fans += [{"Name": "Fan", "Bonus": 1, "Tag": ""}, {"Name": "Superfan", "Bonus": 2, "Tag": ""}]
+    return dict(zip(CATALOG_SHEETS, (stars, powers, events, fans)))
+
+
+def synthetic_catalog() -> CardCatalog:
+    return load_catalog(CachedSpreadsheet(synthetic_rows()))
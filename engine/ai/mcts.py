@@ -0,0 +1,193 @@
+import logging
+import math
+import random
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from engine.game_engine import GameEngine
+from engine.models.state import GameState
+from engine.rules.deck_ops import shuffle_deck
+from engine.rules.actions import ATTACH_POWER, PLAY_STAR, action_command, decode_action, legal_actions
+from engine.ai.random_policy import RandomPolicy
+from engine.ai.transposition import TranspositionTable
+from engine.ai.zobrist import ZobristHasher
+
+logger = logging.getLogger(__name__)
+
+
+def action_key(action: int, state: GameState) -> Hashable:
+    """
+    Identify an action of the current player by what it plays rather than
+    where the card sits in hand, so the same move matches across
+    determinizations.
+    """
+    kind, index, star_index = decode_action(action)
+    if kind == PLAY_STAR or kind == ATTACH_POWER:
+        card_id = state.players[state.current_player].hand[index]
+        return kind, state.cards.definition_ids[card_id], star_index
+    return kind, index, star_index
+
+
+def determinize(state: GameState, player_index: int, rng: random.Random) -> GameState:
+    """
+    Clone the state and resample everything the player cannot see: the
+    other players' hands and the order of every deck.
+    """
+    state = state.clone()
+    unseen = state.main_deck.cards[state.main_deck.cursor:]
+    opponents = [p for i, p in enumerate(state.players) if i != player_index]
+    for opponent in opponents:
+        unseen.extend(opponent.hand)
+    rng.shuffle(unseen)
+
+    for opponent in opponents:
+        size = len(opponent.hand)
+        opponent.hand = unseen[:size]
+        del unseen[:size]
+    state.main_deck.cards = unseen
+    state.main_deck.cursor = 0
+    state.main_deck.shared = False
+    shuffle_deck(state.event_deck, rng)
+    shuffle_deck(state.fan_deck, rng)
+    return state
+
+
+class Edge:
+    __slots__ = ("visits", "wins", "available")
+
+    def __init__(self):
+        self.visits = 0
+        self.wins = 0.0
+        self.available = 0
+
+
+class Node:
+    """
+    Search data for one information set: statistics for each move tried
+    from it, keyed by action_key. Nodes live in the transposition table,
+    so different move orders reaching the same position share them.
+    """
+    __slots__ = ("edges",)
+
+    def __init__(self):
+        self.edges: Dict[Hashable, Edge] = {}
+
+
+class MCTSPolicy:
+    """
+    Information-set Monte Carlo Tree Search. Each playout samples a
+    determinization of the hidden cards, walks the search graph with UCB1,
+    and finishes the game with random play. Positions are identified by a
+    Zobrist hash of what the searching player can see and kept in a bounded
+    transposition table, which also carries results over between moves.
+    Searches for `time_budget_ms` per decision (or `max_playouts`, if set,
+    whichever comes first) and records playouts per second in `last_search`.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None, time_budget_ms: float = 200.0,
+                 max_playouts: Optional[int] = None, exploration: float = 0.7,
+                 table_capacity: int = 200_000):
+        self.rng = rng or random.Random()
+        self.time_budget_ms = time_budget_ms
+        self.max_playouts = max_playouts
+        self.exploration = exploration
+        self.rollout_policy = RandomPolicy(self.rng)
+        self.table = TranspositionTable(table_capacity)
+        self.hashers: Dict[int, ZobristHasher] = {}
+        self.last_search: Dict[str, float] = {}
+
+    def _node(self, player_index: int, hasher: ZobristHasher, state: GameState) -> Node:
+        key = (player_index, hasher.state_hash(state))
+        node = self.table.get(key)
+        if node is None:
+            node = Node()
+            self.table.put(key, node)
+        return node
+
+    def choose(self, engine: GameEngine, player_index: int) -> Dict[str, Any]:
+        actions = legal_actions(engine.state, player_index, engine.config)
+        if len(actions) == 1:
+            return action_command(actions[0], engine.state, player_index)
+
+        hasher = self.hashers.get(player_index)
+        if hasher is None:
+            hasher = self.hashers[player_index] = ZobristHasher(observer=player_index)
+        root_state = engine.state.clone()
+        root_state.zobrist = hasher.full_hash(root_state)
+        root = self._node(player_index, hasher, root_state)
+
+        start = time.perf_counter()
+        deadline = start + self.time_budget_ms / 1000.0
+        playouts = 0
+        while time.perf_counter() < deadline:
+            if self.max_playouts is not None and playouts >= self.max_playouts:
+                break
+            self._playout(engine, root, player_index, hasher)
+            playouts += 1
+
+        elapsed = time.perf_counter() - start
+        self.last_search = {
+            "playouts": playouts,
+            "seconds": elapsed,
+            "playouts_per_second": playouts / elapsed if elapsed else 0.0,
+            "table_size": len(self.table),
+        }
+        logger.debug("MCTS ran %d playouts (%.0f/s)", playouts, self.last_search["playouts_per_second"])
+
+        # Most visited root move, among the moves that are legal for real
+        keyed = {action_key(action, engine.state): action for action in actions}
+        best_key = max(keyed, key=lambda key: root.edges[key].visits if key in root.edges else -1)
+        return action_command(keyed[best_key], engine.state, player_index)
+
+    def _playout(self, engine: GameEngine, root: Node, player_index: int, hasher: ZobristHasher) -> None:
+        sim = GameEngine.from_state(determinize(engine.state, player_index, self.rng), engine.config)
+        sim.enable_hashing(hasher)
+        state = sim.state
+        node = root
+        path: List[Tuple[int, Edge]] = []
+
+        # Selection and expansion
+        while not state.game_over:
+            mover = state.current_player
+            keyed = [(action_key(action, state), action) for action in legal_actions(state, mover, sim.config)]
+            untried = []
+            for key, action in keyed:
+                edge = node.edges.get(key)
+                if edge is None:
+                    untried.append((key, action))
+                else:
+                    edge.available += 1
+
+            if untried:
+                key, action = self.rng.choice(untried)
+                edge = node.edges[key] = Edge()
+                edge.available = 1
+                sim.apply_action(action)
+                path.append((mover, edge))
+                break
+
+            best_score, best = -1.0, None
+            for key, action in keyed:
+                edge = node.edges[key]
+                score = (edge.wins / edge.visits
+                         + self.exploration * math.sqrt(math.log(edge.available) / edge.visits))
+                if score > best_score:
+                    best_score, best = score, (edge, action)
+            edge, action = best
+            sim.apply_action(action)
+            path.append((mover, edge))
+            node = self._node(player_index, hasher, state)
+
+        # Random rollout to the end of the game
+        sim.hasher = None
+        while not state.game_over:
+            sim.apply_action(self.rollout_policy.choose_action(sim, state.current_player))
+
+        # Backpropagation
+        winner = state.winner
+        for mover, edge in path:
+            edge.visits += 1
+            if winner is None:
+                edge.wins += 0.5
+            elif winner == mover:
+                edge.wins += 1.0
@@ -0,0 +1,28 @@
+import random
+from typing import Any, Dict, Optional
+from engine.rules.actions import END_TURN, action_command, legal_actions
+
+
+class RandomPolicy:
+    """
+    Plays like the legacy Player.ai_choose: always plays a card while it can,
+    picking uniformly at random, and picks a random contest stat.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    def choose_action(self, engine: Any, player_index: int) -> int:
+        state = engine.state
+        actions = legal_actions(state, player_index, engine.config)
+        if not actions:
+            return END_TURN
+        if state.pending_event is not None:
+            return self.rng.choice(actions)
+        # END_TURN comes last; only take it when nothing can be played
+        if len(actions) > 1:
+            return self.rng.choice(actions[:-1])
+        return END_TURN
+
+    def choose(self, engine: Any, player_index: int) -> Dict[str, Any]:
+        return action_command(self.choose_action(engine, player_index), engine.state, player_index)
@@ -0,0 +1,119 @@
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from engine.models.state import GameState
+
+# Key namespaces
+HAND, HAND_SIZE, BOARD, ATTACHED, DECK_SIZE, TURN, CURRENT_PLAYER, STARS_PLAYED, POWERS_PLAYED, PENDING_EVENT, GAME_OVER = range(11)
+
+
+class ZobristHasher:
+    """
+    Zobrist hashing of a GameState. Card placement (hands, boards,
+    attachments, deck sizes) is hashed incrementally into state.zobrist by
+    the engine's hooks; the handful of scalar fields are folded in by
+    state_hash(). With an observer, the other players' hands only count by
+    size, so the hash identifies what the observer knows rather than the
+    full state. Deck order is never hashed, only how many cards are left.
+
+    Cards are keyed by definition rather than instance id, and the n-th
+    copy of a definition in a hand or on a star has a key of its own, so
+    states that differ only in which copy of a card sits where hash the
+    same (and two copies do not cancel out). Stars are keyed by their
+    position on their owner's board, which never changes once played.
+    """
+
+    def __init__(self, observer: Optional[int] = None, seed: int = 0x5EED):
+        self.observer = observer
+        self._rng = random.Random(seed)
+        self._keys: Dict[Tuple[int, ...], int] = {}
+
+    def key(self, *parts: int) -> int:
+        k = self._keys.get(parts)
+        if k is None:
+            k = self._keys[parts] = self._rng.getrandbits(64)
+        return k
+
+    def full_hash(self, state: GameState) -> int:
+        """
+        Card placement hash computed from scratch.
+        """
+        definition_ids = state.cards.definition_ids
+        h = 0
+        for p, player in enumerate(state.players):
+            if self.observer is None or p == self.observer:
+                for definition_id, copy in _copies(definition_ids, player.hand):
+                    h ^= self.key(HAND, p, definition_id, copy)
+            else:
+                h ^= self.key(HAND_SIZE, p, len(player.hand))
+            for position, star_id in enumerate(player.star_cards):
+                h ^= self.key(BOARD, p, position, definition_ids[star_id])
+                for definition_id, copy in _copies(definition_ids, _attachments(state, star_id)):
+                    h ^= self.key(ATTACHED, p, position, definition_id, copy)
+        for deck_index, deck in enumerate((state.main_deck, state.event_deck, state.fan_deck)):
+            h ^= self.key(DECK_SIZE, deck_index, len(deck))
+        return h
+
+    def state_hash(self, state: GameState) -> int:
+        pending = state.cards.definition_ids[state.pending_event] if state.pending_event is not None else -1
+        return (state.zobrist
+                ^ self.key(TURN, state.turn)
+                ^ self.key(CURRENT_PLAYER, state.current_player)
+                ^ self.key(STARS_PLAYED, state.stars_played)
+                ^ self.key(POWERS_PLAYED, state.powers_played)
+                ^ self.key(PENDING_EVENT, pending)
+                ^ self.key(GAME_OVER, int(state.game_over)))
+
+    # Incremental hooks, called by GameEngine right after each change
+
+    def hand_added(self, state: GameState, player_index: int, card_id: int) -> None:
+        if self.observer is None or player_index == self.observer:
+            definition_id = state.cards.definition_ids[card_id]
+            copy = _count(state.cards.definition_ids, state.players[player_index].hand, definition_id)
+            state.zobrist ^= self.key(HAND, player_index, definition_id, copy)
+        else:
+            size = len(state.players[player_index].hand)
+            state.zobrist ^= self.key(HAND_SIZE, player_index, size - 1) ^ self.key(HAND_SIZE, player_index, size)
+
+    def hand_removed(self, state: GameState, player_index: int, card_id: int) -> None:
+        if self.observer is None or player_index == self.observer:
+            definition_id = state.cards.definition_ids[card_id]
+            copy = _count(state.cards.definition_ids, state.players[player_index].hand, definition_id) + 1
+            state.zobrist ^= self.key(HAND, player_index, definition_id, copy)
+        else:
+            size = len(state.players[player_index].hand)
+            state.zobrist ^= self.key(HAND_SIZE, player_index, size + 1) ^ self.key(HAND_SIZE, player_index, size)
+
+    def board_added(self, state: GameState, player_index: int, card_id: int) -> None:
+        position = len(state.players[player_index].star_cards) - 1
+        state.zobrist ^= self.key(BOARD, player_index, position, state.cards.definition_ids[card_id])
+
+    def attached(self, state: GameState, star_id: int, card_id: int) -> None:
+        for p, player in enumerate(state.players):
+            if star_id in player.star_cards:
+                definition_id = state.cards.definition_ids[card_id]
+                copy = _count(state.cards.definition_ids, _attachments(state, star_id), definition_id)
+                state.zobrist ^= self.key(ATTACHED, p, player.star_cards.index(star_id), definition_id, copy)
+                return
+
+    def drawn(self, state: GameState, deck_index: int, size: int) -> None:
+        state.zobrist ^= self.key(DECK_SIZE, deck_index, size + 1) ^ self.key(DECK_SIZE, deck_index, size)
+
+
+def _attachments(state: GameState, star_id: int) -> List[int]:
+    return state.cards.attached_fans.get(star_id, []) + state.cards.attached_powers.get(star_id, [])
+
+
+def _count(definition_ids, card_ids: Iterable[int], definition_id: int) -> int:
+    return sum(1 for card_id in card_ids if definition_ids[card_id] == definition_id)
+
+
+def _copies(definition_ids, card_ids: Iterable[int]) -> Iterable[Tuple[int, int]]:
+    """
+    (definition id, n) for each card: the card is the n-th copy of its definition seen so far.
+    """
+    seen: Dict[int, int] = {}
+    for card_id in card_ids:
+        definition_id = definition_ids[card_id]
+        seen[definition_id] = seen.get(definition_id, 0) + 1
+        yield definition_id, seen[definition_id]
@@ -0,0 +1,250 @@
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional
+
+from engine.models.deck import Deck
+from engine.models.player import Player
+from engine.models.registry import CardRegistry, CardTable
+from engine.models.state import GameState
+from engine.rules.fan_ops import refresh_fan_totals
+
+# Binary encoding of a GameState, for saved games, replays and shipping
+# states between processes. Card definitions are not encoded: the decoder
+# is given the CardRegistry of the catalog the game was built from, and
+# every card in the state is a small integer id.
+#
+# Layout, little-endian:
+#   header      magic, format version, id width (1 or 2 bytes)
+#   scalars     turn, contests, current player, per-turn counters, flags,
+#               winner, pending event, pending card (player, id),
+#               zobrist, version
+#   names       player names then deck names, each a length byte and utf-8
+#   ids         one packed run of ids and counts, each id-width wide:
+#               definition id of every instance,
+#               fan and power attachments as (star id, count, ids...),
+#               each player's flags, hand and star cards,
+#               contests won per player, per stat,
+#               the remaining cards of the main, event and fan decks
+# Lists in the id run are a count followed by the ids. Ids are a single
+# byte whenever every value fits, which covers any normal sized game.
+
+MAGIC = b"SPG"
+FORMAT_VERSION = 2
+NONE_ID = 0xFFFF
+
+_HEADER = struct.Struct("<3sBB")
+_SCALARS = struct.Struct("<HHBBBBHHHHQI")
+_GAME_OVER = 0x01
+_HUMAN = 0x01
+_DECKS = ("main_deck", "event_deck", "fan_deck")
+
+_name_bytes: Dict[str, bytes] = {}
+
+
+class StateCodecError(ValueError):
+    pass
+
+
+def _name(text: str) -> bytes:
+    raw = _name_bytes.get(text)
+    if raw is None:
+        encoded = text.encode("utf-8")
+        if len(encoded) > 255:
+            raise StateCodecError(f"Name too long to encode: {text[:40]}...")
+        raw = _name_bytes[text] = bytes((len(encoded),)) + encoded
+    return raw
+
+
+def _optional_id(value: Optional[int]) -> int:
+    return NONE_ID if value is None else value
+
+
+def encode_state(state: GameState) -> bytes:
+    """
+    Pack the whole state into bytes. decode_state(encode_state(state), registry)
+    gives back an equal state; only the deck cursors are reset, since cards
+    already drawn are not encoded.
+    """
+    pending = state.pending_card
+    cards = state.cards
+    decks = (state.main_deck, state.event_deck, state.fan_deck)
+
+    ids = cards.definition_ids.tolist()
+    for attachments in (cards.attached_fans, cards.attached_powers):
+        ids.append(len(attachments))
+        for star_id, card_ids in attachments.items():
+            ids.append(star_id)
+            ids.append(len(card_ids))
+            ids += card_ids
+    for player in state.players:
+        ids.append(_HUMAN if player.is_human else 0)
+        ids.append(len(player.hand))
+        ids += player.hand
+        ids.append(len(player.star_cards))
+        ids += player.star_cards
+    ids.append(len(state.stat_wins))
+    for wins in state.stat_wins:
+        ids.append(len(wins))
+        ids += wins
+    for deck in decks:
+        remaining = deck.cards[deck.cursor:] if deck.cursor else deck.cards
+        ids.append(len(remaining))
+        ids += remaining
+
+    try:
+        packed, width = bytes(ids), 1
+    except ValueError:
+        words = array("H", ids)
+        if sys.byteorder != "little":
+            words.byteswap()
+        packed, width = words.tobytes(), 2
+
+    return b"".join((
+        _HEADER.pack(MAGIC, FORMAT_VERSION, width),
+        _SCALARS.pack(
+            state.turn,
+            state.contests,
+            state.current_player,
+            state.stars_played,
+            state.powers_played,
+            _GAME_OVER if state.game_over else 0,
+            _optional_id(state.winner),
+            _optional_id(state.pending_event),
+            pending["player"] if pending else NONE_ID,
+            pending["card_id"] if pending else NONE_ID,
+            state.zobrist,
+            state.version,
+        ),
+        bytes((len(state.players), len(cards.definition_ids) & 0xFF, len(cards.definition_ids) >> 8)),
+        *[_name(player.name) for player in state.players],
+        *[_name(deck.name) for deck in decks],
+        packed,
+    ))
+
+
+def decode_state(data: bytes, registry: CardRegistry) -> GameState:
+    """
+    Rebuild a GameState from encode_state() output. `registry` must hold the
+    card definitions the game was built from.
+    """
+    try:
+        magic, format_version, width = _HEADER.unpack_from(data)
+        if magic != MAGIC or format_version != FORMAT_VERSION or width not in (1, 2):
+            raise StateCodecError(f"Not an encoded state (header {bytes(data[:_HEADER.size])!r})")
+        (turn, contests, current_player, stars_played, powers_played, flags, winner, pending_event,
+         pending_player, pending_card_id, zobrist, version) = _SCALARS.unpack_from(data, _HEADER.size)
+        pos = _HEADER.size + _SCALARS.size
+        player_count, table_low, table_high = data[pos:pos + 3]
+        pos += 3
+
+        names = []
+        for _ in range(player_count + len(_DECKS)):
+            size = data[pos]
+            names.append(str(data[pos + 1:pos + 1 + size], "utf-8"))
+            pos += 1 + size
+    except (struct.error, ValueError) as e:
+        if isinstance(e, StateCodecError):
+            raise
+        raise StateCodecError(f"Encoded state is truncated: {e}") from e
+
+    if width == 1:
+        ids = list(data[pos:])
+    else:
+        words = array("H")
+        try:
+            words.frombytes(data[pos:])
+        except ValueError as e:
+            raise StateCodecError("Encoded state is truncated") from e
+        if sys.byteorder != "little":
+            words.byteswap()
+        ids = words.tolist()
+
+    try:
+        return _decode_ids(ids, names, registry, table_low | table_high << 8, (
+            turn, contests, current_player, stars_played, powers_played, flags, winner,
+            pending_event, pending_player, pending_card_id, zobrist, version,
+        ))
+    except IndexError as e:
+        raise StateCodecError("Encoded state is truncated") from e
+
+
+def _decode_ids(ids: List[int], names: List[str], registry: CardRegistry, table_size: int,
+                scalars: tuple) -> GameState:
+    (turn, contests, current_player, stars_played, powers_played, flags, winner,
+     pending_event, pending_player, pending_card_id, zobrist, version) = scalars
+    pos = 0
+
+    def read_list() -> List[int]:
+        nonlocal pos
+        count = ids[pos]
+        end = pos + 1 + count
+        if end > len(ids):
+            raise IndexError("list runs past the end")
+        values = ids[pos + 1:end]
+        pos = end
+        return values
+
+    cards = CardTable(registry)
+    cards.definition_ids = array("H", ids[:table_size])
+    if len(cards.definition_ids) != table_size:
+        raise IndexError("card table runs past the end")
+    if table_size and max(cards.definition_ids) >= len(registry):
+        raise StateCodecError("Encoded state uses cards missing from the registry")
+    pos = table_size
+
+    attachments = []
+    for _ in range(2):
+        stars = {}
+        count = ids[pos]
+        pos += 1
+        for _ in range(count):
+            star_id = ids[pos]
+            pos += 1
+            stars[star_id] = read_list()
+        attachments.append(stars)
+    cards.attached_fans, cards.attached_powers = attachments
+    cards.refresh_stats()
+
+    players = []
+    for name in names[:-len(_DECKS)]:
+        player_flags = ids[pos]
+        pos += 1
+        hand = read_list()
+        players.append(Player(name, bool(player_flags & _HUMAN), hand, read_list()))
+    count = ids[pos]
+    pos += 1
+    stat_wins = [read_list() for _ in range(count)]
+    main_deck, event_deck, fan_deck = (Deck(name, read_list()) for name in names[-len(_DECKS):])
+    if pos != len(ids):
+        raise StateCodecError("Encoded state has trailing data")
+
+    pending_card = None
+    if pending_card_id != NONE_ID:
+        pending_card = {
+            "player": pending_player,
+            "card_id": pending_card_id,
+            "card_type": "PowerCard",
+            "target_type": "star",
+        }
+    state = GameState(
+        players=players,
+        main_deck=main_deck,
+        event_deck=event_deck,
+        fan_deck=fan_deck,
+        cards=cards,
+        turn=turn,
+        current_player=current_player,
+        stars_played=stars_played,
+        powers_played=powers_played,
+        contests=contests,
+        game_over=bool(flags & _GAME_OVER),
+        winner=None if winner == NONE_ID else winner,
+        pending_card=pending_card,
+        pending_event=None if pending_event == NONE_ID else pending_event,
+        zobrist=zobrist,
+        version=version,
+        stat_wins=stat_wins,
+    )
+    refresh_fan_totals(state)
+    return state
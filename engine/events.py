@@ -0,0 +1,199 @@
+import logging
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from engine.models.cards import STATS
+
+# Structured game events. An event is a kind, the version of the game the
+# command that raised it started from, and a fixed set of ints for that
+# kind (player index, card ids, stat index ...). Raising one costs a tuple;
+# turning it into text is left to the sinks that want text, and an engine
+# without an EventTrace pays a single `is None` check per call site.
+#
+# Each kind belongs to a subsystem and has a level, so e.g. deck draws can
+# be switched on at DEBUG without the rest of the engine getting chattier.
+
+DEBUG, INFO = logging.DEBUG, logging.INFO
+
+# name, subsystem, level, fields
+EVENTS: Tuple[Tuple[str, str, int, Tuple[str, ...]], ...] = (
+    ("game_start", "engine", INFO, ("game", "players")),
+    ("command", "engine", INFO, ("command", "player", "card", "hand_index", "star_index", "stat")),
+    ("rejected", "engine", INFO, ("command", "player")),
+    ("turn", "engine", DEBUG, ("turn", "player")),
+    ("draw", "deck", DEBUG, ("deck", "card", "remaining")),
+    ("star_played", "rules", INFO, ("player", "card")),
+    ("power_attached", "rules", INFO, ("player", "card", "star")),
+    ("contest", "contest", INFO, ("event_card", "stat")),
+    ("fan_awarded", "contest", INFO, ("player", "star", "fan", "fans")),
+    ("game_over", "engine", INFO, ("turn", "winner")),
+)
+(GAME_START, COMMAND, REJECTED, TURN, DRAW, STAR_PLAYED, POWER_ATTACHED, CONTEST,
+ FAN_AWARDED, GAME_OVER) = range(len(EVENTS))
+SUBSYSTEMS = tuple(dict.fromkeys(subsystem for _, subsystem, _, _ in EVENTS))
+
+# Command types and stats as they appear in event fields; -1 is "none"
+COMMAND_TYPES = ("PLAY_CARD", "END_TURN", "CHOOSE_STAT")
+NONE = -1
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _int_field(value: Any) -> int:
+    # Fields are written as int32s by BinaryEventSink
+    return value if type(value) is int and INT32_MIN <= value <= INT32_MAX else NONE
+
+
+def command_fields(command: Dict[str, Any]) -> Tuple[int, ...]:
+    """
+    A command as COMMAND event fields. Commands come from clients, so
+    anything that is not an int, or does not fit in an int32, is reported
+    as NONE.
+    """
+    payload = command.get("payload", {})
+    if not isinstance(payload, dict):
+        payload = {}
+    action = command.get("type")
+    stat = payload.get("stat")
+    return (
+        COMMAND_TYPES.index(action) if action in COMMAND_TYPES else NONE,
+        _int_field(payload.get("player", 0)),
+        _int_field(payload.get("card_id")),
+        _int_field(payload.get("hand_index")),
+        _int_field(payload.get("star_index")),
+        STATS.index(stat) if stat in STATS else NONE,
+    )
+
+
+class EventTrace:
+    """
+    Routes game events to sinks. `level` applies to every subsystem not
+    named in `levels`; events below their subsystem's level are dropped
+    before any sink sees them. Hand one to GameEngine.trace().
+    """
+
+    def __init__(self, sinks: Sequence[Any] = (), level: int = INFO, levels: Optional[Dict[str, int]] = None):
+        self.sinks = list(sinks)
+        self.level = level
+        self.levels = dict(levels or {})
+        self.enabled = bytearray(len(EVENTS))
+        self._refresh()
+
+    def set_level(self, subsystem: str, level: int) -> None:
+        if subsystem not in SUBSYSTEMS:
+            raise ValueError(f"Unknown event subsystem: {subsystem}")
+        self.levels[subsystem] = level
+        self._refresh()
+
+    def _refresh(self) -> None:
+        for kind, (_, subsystem, level, _) in enumerate(EVENTS):
+            self.enabled[kind] = level >= self.levels.get(subsystem, self.level)
+
+    def emit(self, kind: int, version: int, *values: int) -> None:
+        if self.enabled[kind]:
+            for sink in self.sinks:
+                sink.write(kind, version, values)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+
+
+class LoggingSink:
+    """
+    Writes events to the standard logging module, one logger per subsystem
+    ("engine.events.<subsystem>"). The message is a %-format string with the
+    fields as arguments, so text is only built for records a handler emits.
+    """
+
+    def __init__(self, prefix: str = "engine.events"):
+        self.loggers = {subsystem: logging.getLogger(f"{prefix}.{subsystem}") for subsystem in SUBSYSTEMS}
+        self.formats = [
+            f"v%d {name} " + " ".join(f"{field}=%d" for field in fields)
+            for name, _, _, fields in EVENTS
+        ]
+
+    def write(self, kind: int, version: int, values: Tuple[int, ...]) -> None:
+        _, subsystem, level, _ = EVENTS[kind]
+        self.loggers[subsystem].log(level, self.formats[kind], version, *values)
+
+
+class BufferSink:
+    """
+    Keeps events in memory as (kind, version, values) tuples.
+    """
+
+    def __init__(self):
+        self.events: List[Tuple[int, int, Tuple[int, ...]]] = []
+
+    def write(self, kind: int, version: int, values: Tuple[int, ...]) -> None:
+        self.events.append((kind, version, values))
+
+
+# Binary event files: MAGIC, then one record per event, little-endian:
+# kind (uint8), version (uint32), then the kind's fields as int32s.
+MAGIC = b"SPEV\x01"
+_RECORDS = [struct.Struct(f"<BI{len(fields)}i") for _, _, _, fields in EVENTS]
+FLUSH_BYTES = 1 << 16
+
+
+class BinaryEventSink:
+    """
+    Appends events to a compact binary file, buffered and written every
+    FLUSH_BYTES and on close(). read_events() reads it back.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        self._buffer = bytearray()
+
+    def write(self, kind: int, version: int, values: Tuple[int, ...]) -> None:
+        self._buffer += _RECORDS[kind].pack(kind, version, *values)
+        if len(self._buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            del self._buffer[:]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Events from a BinaryEventSink file as dicts: the event name, the
+    version and the kind's fields.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a game event file")
+    pos = len(MAGIC)
+    while pos < len(data):
+        kind = data[pos]
+        if kind >= len(EVENTS):
+            raise ValueError(f"{path} has an unknown event kind {kind} at byte {pos}")
+        record = _RECORDS[kind]
+        if pos + record.size > len(data):
+            raise ValueError(f"{path} ends in the middle of an event")
+        _, version, *values = record.unpack_from(data, pos)
+        pos += record.size
+        name, _, _, fields = EVENTS[kind]
+        yield {"event": name, "version": version, **dict(zip(fields, values))}
+
+
+def sampled(game_index: int, every: int) -> bool:
+    """
+    Whether game `game_index` of a run is traced when tracing 1 in `every` games.
+    """
+    return every > 0 and game_index % every == 0
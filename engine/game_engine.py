@@ -1,61 +1,412 @@
 from typing import List, Dict, Any, Tuple, Optional
-from engine.serializers import player_view, deck_view
+from resources.config import GAME_CONFIG
+from engine.serializers import player_view, deck_view, instance_card_view
 from engine.rules.common_ops import play_card_from_hand
-# from engine.rules.power_ops import attach_power_by_ids
-from engine.models.cards import StarCard, PowerCard
+from engine.rules.actions import action_command, action_matches_card, decode_action, legal_actions
+from engine.rules.deck_ops import draw_card
+from engine.events import (
+    COMMAND, CONTEST, DRAW, FAN_AWARDED, GAME_OVER, GAME_START, NONE, POWER_ATTACHED, REJECTED,
+    STAR_PLAYED, TURN, command_fields,
+)
+from engine.rules.event_ops import STATS, STAT_INDEX, needs_stat_choice, resolve_contest
+from engine.rules.fan_ops import award_fan, leading_player, refresh_fan_totals
+from engine.models.cards import StarCard, PowerCard, StatContestEvent
+from engine.models.registry import CardTable
+from engine.models.state import GameState
+from engine.profiling import PHASES
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Deck indexes reported to the hasher
+MAIN_DECK, EVENT_DECK, FAN_DECK = range(3)
+DECK_ZONES = ("main_deck", "event_deck", "fan_deck")
+
+# State fields reported in a delta whenever a command changes them
+DELTA_FIELDS = ("turn", "current_player", "stars_played", "powers_played",
+                "pending_event", "pending_card", "game_over", "winner")
+
 class GameEngine:
-    def __init__(self, players: List[Any], decks: Tuple[Any, Any, Any]):
+    def __init__(self, players: List[Any], decks: Tuple[Any, Any, Any], cards: CardTable,
+                 config: Optional[Dict[str, Any]] = None):
         logger.info("Initializing GameEngine")
-        self.players = players
-        self.main_deck, self.event_deck, self.fan_deck = decks
-        self.turn = 1
+        main_deck, event_deck, fan_deck = decks
+        self.state = GameState(players, main_deck, event_deck, fan_deck, cards,
+                               stat_wins=[[0] * len(STATS) for _ in players])
+        refresh_fan_totals(self.state)
+        self.config = config or GAME_CONFIG
+        self.hasher = None
+        self._changes: Optional[List[Dict[str, Any]]] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._player_views: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+        self.log = None
+        self._draws: Optional[List[List[int]]] = None
+        self.events = None
+        self.profiler = None
+
+    @classmethod
+    def from_state(cls, state: GameState, config: Optional[Dict[str, Any]] = None,
+                   hasher: Any = None) -> "GameEngine":
+        engine = cls.__new__(cls)
+        engine.state = state
+        engine.config = config or GAME_CONFIG
+        engine.hasher = hasher
+        engine._changes = None
+        engine._snapshot = None
+        engine._player_views = {}
+        engine.log = None
+        engine._draws = None
+        engine.events = None
+        engine.profiler = None
+        return engine
+
+    def clone(self) -> "GameEngine":
+        """
+        Engine over an independent copy of the state, for lookahead.
+        """
+        return GameEngine.from_state(self.state.clone(), self.config, self.hasher)
+
+    def enable_hashing(self, hasher: Any) -> None:
+        """
+        Keep state.zobrist up to date with `hasher` (a ZobristHasher) from now on.
+        """
+        self.hasher = hasher
+        self.state.zobrist = hasher.full_hash(self.state)
+
+    def record(self, log: Any) -> None:
+        """
+        Append every accepted command and the cards it drew to `log` (an
+        engine.replay.ActionLog) from now on. Clones do not record.
+        """
+        self.log = log
+        log.start(self.state)
+
+    def trace(self, events: Any, game: int = 0) -> None:
+        """
+        Send game events to `events` (an engine.events.EventTrace) from now
+        on. `game` identifies this game among others sharing the trace.
+        Clones are not traced.
+        """
+        self.events = events
+        events.emit(GAME_START, self.state.version, game, len(self.state.players))
+
+    def profile(self, profiler: Any) -> None:
+        """
+        Time this engine's phases and commands with `profiler` (an
+        engine.profiling.PhaseProfiler) from now on. The timed wrappers are
+        set on this instance only, so other engines and clones run untimed.
+        """
+        self.profiler = profiler
+        engine_type = type(self)
+        for method, phase in PHASES.items():
+            setattr(self, method, profiler.timed(phase, getattr(engine_type, method).__get__(self)))
+        self.apply = profiler.timed_command(engine_type.apply.__get__(self))
 
-        self.pending_card: Optional[Dict[str, Any]] = None
+    def _draw(self, deck: Any, deck_index: int) -> Optional[int]:
+        card_id = draw_card(deck)
+        if card_id is not None:
+            if self.hasher is not None:
+                self.hasher.drawn(self.state, deck_index, len(deck))
+            if self._draws is not None:
+                self._draws.append([deck_index, card_id])
+            if self.events is not None:
+                self.events.emit(DRAW, self.state.version, deck_index, card_id, len(deck))
+        return card_id
+
+    def _moved(self, card_id: int, source: List[Any], target: List[Any]) -> None:
+        """
+        Record a card move for the delta of the command being dispatched.
+        Cards leaving a deck carry their view, since the client has not
+        seen them before.
+        """
+        if self._changes is None:
+            return
+        change = {"card": card_id, "from": source, "to": target}
+        if source[0] in DECK_ZONES:
+            change["view"] = instance_card_view(self.state.cards, card_id)
+        self._changes.append(change)
 
     def dispatch(self, command: dict) -> Dict[str, Any]:
+        """
+        Run a command and describe what it changed, e.g. a card moving from
+        ["hand", 0, 2] to ["stars", 0, 1], plus any state field that changed.
+        `version` goes up by one for every accepted command; a consumer that
+        sees a gap should resync from snapshot().
+        """
+        state = self.state
+        before = [getattr(state, name) for name in DELTA_FIELDS]
+        self._changes = []
+        try:
+            accepted = self.apply(command)
+        finally:
+            changes, self._changes = self._changes, None
+
+        for name, old in zip(DELTA_FIELDS, before):
+            new = getattr(state, name)
+            if new == old:
+                continue
+            if name == "pending_event":
+                # Same shape as snapshot(): the event's name and its options
+                event = state.cards[new] if new is not None else None
+                changes.append({"field": name, "value": event.name if event else None})
+                changes.append({"field": "pending_stat_options",
+                                "value": list(event.stat_options) if event else []})
+            else:
+                changes.append({"field": name, "value": new})
+        return {"version": state.version, "accepted": accepted, "changes": changes}
+
+    def apply_action(self, action: int) -> bool:
+        """
+        apply() for an action from engine.rules.actions.legal_actions.
+        """
+        if not action_matches_card(action, self.state):
+            logger.info("Action %s does not match the card in hand", decode_action(action))
+            return False
+        return self.apply(action_command(action, self.state))
+
+    def apply(self, command: dict) -> bool:
+        """
+        Run a command against the game state without building a snapshot.
+        Returns True if the command changed the state.
+        """
+        log = self.log
+        if log is not None:
+            self._draws = []
+        events = self.events
+        if events is not None and events.enabled[COMMAND]:
+            events.emit(COMMAND, self.state.version, *command_fields(command))
+        accepted = self._apply(command)
+        if accepted:
+            self.state.version += 1
+            if log is not None:
+                log.append(command, self._draws, self.state)
+        elif events is not None and events.enabled[REJECTED]:
+            events.emit(REJECTED, self.state.version, *command_fields(command)[:2])
+        return accepted
+
+    def _apply(self, command: dict) -> bool:
+        state = self.state
         action = command.get("type")
         payload = command.get("payload", {})
-        logger.info(f"Dispatch: {action} {payload}")
+
+        if state.game_over:
+            logger.info("Game is over, ignoring %s", action)
+            return False
+
+        player_index = payload.get("player", 0)
+        if not 0 <= player_index < len(state.players):
+            logger.info("Invalid player index: %s", player_index)
+            return False
+        if player_index != state.current_player:
+            logger.info("Not %s's turn", state.players[player_index].name)
+            return False
 
         if action == "PLAY_CARD":
-            player_index = payload.get("player", 0)
             hand_index = payload.get("hand_index")
-            if 0 <= player_index < len(self.players):
-                player = self.players[player_index]
-
-                if isinstance(player, StarCard):
-                    play_card_from_hand(player, hand_index)
-                elif isinstance(player, PowerCard) and getattr(card, "targets_star", False):
-                    if player.star_cards:
-                        self.pending_card = {
-                            "player": player_index,
-                            "card_id": getattr(card, "id", None),
-                            "card_type": "PowerCard",
-                            "target_type": "star",
-                        }
-                    else:
-                        logger.info(f"{player.name} cannot play PowerCard without a Star on board")
-
-                else:
-                    logger.info(f"Unknown card type or unsupported action: {type(card).__name__}")
-
-                    
-            else:
-                logger.info(f"Invalid player index: {player}")
+            if "card_id" in payload:
+                hand = state.players[player_index].hand
+                hand_index = hand.index(payload["card_id"]) if payload["card_id"] in hand else None
+            return self._play_card(player_index, hand_index, payload.get("star_index"))
+        if action == "END_TURN":
+            return self._end_turn()
+        if action == "CHOOSE_STAT":
+            return self._choose_stat(payload.get("stat"))
+
+        logger.info("Unknown command: %s", action)
+        return False
+
+    def _play_card(self, player_index: int, hand_index: Optional[int], star_index: Optional[int]) -> bool:
+        state = self.state
+        if state.pending_event is not None:
+            logger.info("A contest stat must be chosen first")
+            return False
+
+        player = state.players[player_index]
+        if hand_index is None or not 0 <= hand_index < len(player.hand):
+            logger.info("Invalid hand index: %s", hand_index)
+            return False
+        card_id = player.hand[hand_index]
+        card = state.cards[card_id]
+
+        if isinstance(card, StarCard):
+            if state.stars_played >= self.config["star_cards_per_turn_limit"]:
+                logger.info("%s has already played a Star this turn", player.name)
+                return False
+            if play_card_from_hand(player, hand_index, state.cards) is None:
+                return False
+            state.stars_played += 1
+            self._moved(card_id, ["hand", player_index, hand_index], ["stars", player_index, len(player.star_cards) - 1])
+            if self.events is not None:
+                self.events.emit(STAR_PLAYED, state.version, player_index, card_id)
+            if self.hasher is not None:
+                self.hasher.hand_removed(state, player_index, card_id)
+                self.hasher.board_added(state, player_index, card_id)
+            return True
+
+        if isinstance(card, PowerCard) and getattr(card, "targets_star", False):
+            if state.powers_played >= self.config["power_cards_per_turn_limit"]:
+                logger.info("%s has already played their Power cards this turn", player.name)
+                return False
+            if not player.star_cards:
+                logger.info("%s cannot play PowerCard without a Star on board", player.name)
+                return False
+            if star_index is None:
+                state.pending_card = {
+                    "player": player_index,
+                    "card_id": card_id,
+                    "card_type": "PowerCard",
+                    "target_type": "star",
+                }
+                return True
+            if play_card_from_hand(player, hand_index, state.cards, star_index) is None:
+                return False
+            state.pending_card = None
+            state.powers_played += 1
+            self._moved(card_id, ["hand", player_index, hand_index], ["powers", player.star_cards[star_index]])
+            if self.events is not None:
+                self.events.emit(POWER_ATTACHED, state.version, player_index, card_id, player.star_cards[star_index])
+            if self.hasher is not None:
+                self.hasher.hand_removed(state, player_index, card_id)
+                self.hasher.attached(state, player.star_cards[star_index], card_id)
+            return True
+
+        logger.info("Unknown card type or unsupported action: %s", type(card).__name__)
+        return False
+
+    def _end_turn(self) -> bool:
+        state = self.state
+        if state.pending_event is not None:
+            logger.info("A contest stat must be chosen first")
+            return False
+        state.pending_card = None
+
+        if state.turn >= self.config["event_start_turn"]:
+            event_id = self._draw(state.event_deck, EVENT_DECK)
+            event = state.cards[event_id] if event_id is not None else None
+            if event_id is not None:
+                self._moved(event_id, ["event_deck"], ["event"])
+            if isinstance(event, StatContestEvent):
+                if needs_stat_choice(event) and any(p.star_cards for p in state.players):
+                    # The player whose turn it is picks the stat
+                    state.pending_event = event_id
+                    return True
+                self._run_contest(event_id, event.stat_options[0])
+
+        if not state.game_over:
+            self._next_turn()
+        return True
+
+    def _choose_stat(self, stat: Optional[str]) -> bool:
+        state = self.state
+        if state.pending_event is None or stat not in state.cards[state.pending_event].stat_options:
+            logger.info("Invalid contest stat: %s", stat)
+            return False
+        event_id, state.pending_event = state.pending_event, None
+        self._run_contest(event_id, stat)
+        if not state.game_over:
+            self._next_turn()
+        return True
+
+    def _run_contest(self, event_id: int, stat: str) -> None:
+        state = self.state
+        state.contests += 1
+        events = self.events
+        if events is not None:
+            events.emit(CONTEST, state.version, event_id, STAT_INDEX[stat])
+        leader_fans = 0
+        for player_index, star_id in resolve_contest(state.players, stat, state.cards):
+            state.stat_wins[player_index][STAT_INDEX[stat]] += 1
+            fan_id = self._draw(state.fan_deck, FAN_DECK)
+            if fan_id is None:
+                break
+            fans = award_fan(state, player_index, star_id, fan_id)
+            leader_fans = max(leader_fans, fans)
+            self._moved(fan_id, ["fan_deck"], ["fans", star_id])
+            if self.hasher is not None:
+                self.hasher.attached(state, star_id, fan_id)
+            if events is not None:
+                events.emit(FAN_AWARDED, state.version, player_index, star_id, fan_id, fans)
+
+        # Only the winners' totals changed, and none had reached the target before
+        if leader_fans >= self.config["fans_to_win"]:
+            self._finish()
+
+    def _next_turn(self) -> None:
+        state = self.state
+        state.current_player = (state.current_player + 1) % len(state.players)
+        if state.current_player == 0:
+            state.turn += 1
+        state.stars_played = 0
+        state.powers_played = 0
+        if self.events is not None:
+            self.events.emit(TURN, state.version, state.turn, state.current_player)
+
+        # The starting player skips the draw on turn 1; everyone draws after that
+        player = state.players[state.current_player]
+        for _ in range(self.config["cards_drawn_per_turn"]):
+            card = self._draw(state.main_deck, MAIN_DECK)
+            if card is None:
+                logger.info("Main deck is empty")
+                self._finish()
+                return
+            player.hand.append(card)
+            self._moved(card, ["main_deck"], ["hand", state.current_player, len(player.hand) - 1])
+            if self.hasher is not None:
+                self.hasher.hand_added(state, state.current_player, card)
+
+    def _finish(self) -> None:
+        state = self.state
+        state.game_over = True
+        state.winner = leading_player(state.fan_totals)
+        if self.events is not None:
+            self.events.emit(GAME_OVER, state.version, state.turn, NONE if state.winner is None else state.winner)
 
-        return self.snapshot()
+    def _player_view(self, player_index: int) -> Dict[str, Any]:
+        """
+        A player's view is rebuilt only when their hand, board, the
+        attachments on their stars or their legal plays changed since it
+        was last built. Only human players get play buttons.
+        """
+        state = self.state
+        player = state.players[player_index]
+        attached_fans, attached_powers = state.cards.attached_fans, state.cards.attached_powers
+        actions = tuple(legal_actions(state, player_index, self.config)) if player.is_human else ()
+        key = (
+            tuple(player.hand),
+            tuple(player.star_cards),
+            tuple((len(attached_fans.get(s, ())), len(attached_powers.get(s, ()))) for s in player.star_cards),
+            actions,
+        )
+        cached = self._player_views.get(player_index)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        view = player_view(player, state.cards, player_index=player_index, actions=actions)
+        self._player_views[player_index] = (key, view)
+        return view
 
     def snapshot(self) -> Dict[str, Any]:
-        return {
-            "turn": self.turn,
-            "players": [player_view(player, player_index=i) for i, player in enumerate(self.players)],
-            "main_deck": deck_view(self.main_deck),
-            "event_deck": deck_view(self.event_deck),
-            "fan_deck": deck_view(self.fan_deck),
+        """
+        Full view of the game for clients. It is cached until the state
+        version changes, and parts of it are shared between snapshots, so
+        callers must treat it as read-only.
+        """
+        state = self.state
+        if self._snapshot is not None and self._snapshot["version"] == state.version:
+            return self._snapshot
+        self._snapshot = {
+            "version": state.version,
+            "turn": state.turn,
+            "current_player": state.current_player,
+            "stars_played": state.stars_played,
+            "powers_played": state.powers_played,
+            "pending_card": dict(state.pending_card) if state.pending_card is not None else None,
+            "pending_event": state.cards[state.pending_event].name if state.pending_event is not None else None,
+            "pending_stat_options": list(state.cards[state.pending_event].stat_options) if state.pending_event is not None else [],
+            "game_over": state.game_over,
+            "winner": state.winner,
+            "players": [self._player_view(i) for i in range(len(state.players))],
+            "main_deck": deck_view(state.main_deck),
+            "event_deck": deck_view(state.event_deck),
+            "fan_deck": deck_view(state.fan_deck),
         }
-    
-    
\ No newline at end of file
+        return self._snapshot
@@ -1,56 +1,60 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
-import uuid
+from dataclasses import dataclass
+from typing import Tuple, Optional
 
-@dataclass
+# Card definitions are immutable and shared by every game. `id` is the
+# definition id in the CardRegistry; per-game state such as attachments
+# lives in CardTable.
+
+STATS = ("aura", "talent", "influence", "legacy")
+
+@dataclass(frozen=True, slots=True)
 class StarCard:
-    id: str
+    id: int
     name: str
     aura: int
     talent: int
     influence: int
     legacy: int
-    tags: List[str] = field(default_factory=list)
-    attached_fans: List[FanCard] = field(default_factory=list)
-    attached_power_cards: List[PowerCard] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class EventCard:
-    id: str
+    id: int
     name: str
     description: str = ""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StatContestEvent(EventCard):
-    stat_options: List[str] = field(default_factory=list)
+    stat_options: Tuple[str, ...] = ()
     contest_type: str = "custom"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FanCard:
-    id: str
+    id: int
     name: str
     bonus: int
     tag: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PowerCard:
-    id: str
+    id: int
     name: str
     description: str = ""
     targets_star: bool = False
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModifyStatCard(PowerCard):
-    stat_modifiers: Dict[str, int] = field(default_factory=dict)
+    # (stat, modifier) pairs; a tuple so the card stays hashable like the others
+    stat_modifiers: Tuple[Tuple[str, int], ...] = ()
     targets_star: bool = True
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LocationPowerCard(PowerCard):
     pass
@@ -3,5 +3,20 @@ from typing import List, Any
 
 @dataclass
 class Deck:
+    """
+    Cards are stored top first. Drawing advances `cursor` instead of
+    removing from the front, so cards[cursor:] is what is left in the deck.
+    After clone() both decks share `cards` until one of them has to
+    change the list itself; drawing only moves the cursor.
+    """
     name: str
-    cards: List[Any] = field(default_factory=list)
\ No newline at end of file
+    cards: List[Any] = field(default_factory=list)
+    cursor: int = 0
+    shared: bool = field(default=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.cards) - self.cursor
+
+    def clone(self) -> "Deck":
+        self.shared = True
+        return Deck(self.name, self.cards, self.cursor, shared=True)
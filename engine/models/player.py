@@ -5,6 +5,6 @@ from typing import List, Any
 class Player:
     name: str
     is_human: bool = True
-    hand: List[Any] = field(default_factory=list)
-    star_cards: List[Any] = field(default_factory=list)
+    hand: List[int] = field(default_factory=list)
+    star_cards: List[int] = field(default_factory=list)
     locations: List[Any] = field(default_factory=list)
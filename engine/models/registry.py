@@ -0,0 +1,161 @@
+from array import array
+from operator import add
+from typing import Any, Dict, Iterable, List, Tuple
+from engine.models.cards import STATS, StarCard, PowerCard, ModifyStatCard
+
+# What a card in hand can be played as (CardRegistry.play_kinds)
+UNPLAYABLE, STAR, TARGETED_POWER = range(3)
+
+# How many games' base stat matrices CardRegistry.base_stats keeps
+BASE_STATS_CACHE = 64
+
+
+class CardRegistry:
+    """
+    Every card definition in the catalog, indexed by its small integer id.
+    Shared by all games built from the same catalog, along with the cached
+    views of each definition (see engine.serializers.static_card_view).
+    """
+
+    def __init__(self, definitions: Iterable[Any] = ()):
+        self.definitions: List[Any] = []
+        self.views: Dict[int, Dict[str, Any]] = {}
+        # Per definition, in STATS order: a star's base stats, or what a
+        # stat modifier adds to the star it is attached to
+        self.stat_rows: List[Tuple[int, ...]] = []
+        # The same rows packed as CardTable.stats bytes, for bulk rebuilds
+        self.stat_row_bytes: List[bytes] = []
+        self._base_stats: Dict[bytes, bytes] = {}
+        self.play_kinds = bytearray()
+        for card in definitions:
+            self.register(card)
+
+    def register(self, card: Any) -> int:
+        if card.id != len(self.definitions):
+            raise ValueError(f"Card ids must be registered in order, got {card.id} for {card.name}")
+        self.definitions.append(card)
+        if isinstance(card, StarCard):
+            self.stat_rows.append(tuple(getattr(card, stat) for stat in STATS))
+        elif isinstance(card, ModifyStatCard):
+            modifiers = dict(card.stat_modifiers)
+            self.stat_rows.append(tuple(modifiers.get(stat, 0) for stat in STATS))
+        else:
+            self.stat_rows.append((0,) * len(STATS))
+        self.stat_row_bytes.append(array("h", self.stat_rows[-1]).tobytes())
+        if isinstance(card, StarCard):
+            self.play_kinds.append(STAR)
+        elif isinstance(card, PowerCard) and card.targets_star:
+            self.play_kinds.append(TARGETED_POWER)
+        else:
+            self.play_kinds.append(UNPLAYABLE)
+        return card.id
+
+    def base_stats(self, definition_ids: array) -> bytes:
+        """
+        The packed stat rows of a whole card table, before attachments.
+        States decoded from the same game share their table, so the last
+        few are cached by the table's contents.
+        """
+        key = definition_ids.tobytes()
+        packed = self._base_stats.get(key)
+        if packed is None:
+            if len(self._base_stats) >= BASE_STATS_CACHE:
+                self._base_stats.clear()
+            packed = self._base_stats[key] = b"".join(map(self.stat_row_bytes.__getitem__, definition_ids))
+        return packed
+
+    def __getitem__(self, definition_id: int) -> Any:
+        return self.definitions[definition_id]
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+
+class CardTable:
+    """
+    The physical cards of one game. Each copy gets an instance id that maps
+    to its definition id; decks, hands and boards hold instance ids only.
+    Per-game attachments are keyed by the instance id of the star, so the
+    definitions themselves are never copied or mutated.
+
+    `stats` is the effective-stat matrix: one row of len(STATS) values per
+    instance, the star's base stats plus the modifiers attached to it
+    (unclamped; see engine.rules.event_ops.effective_stat). `fan_bonus`
+    holds each star's fan bonus (see engine.rules.fan_ops.star_fan_bonus).
+    Both are updated as cards are attached, so reads never walk the
+    attachment lists.
+    """
+    __slots__ = ("registry", "definition_ids", "attached_fans", "attached_powers", "stats", "fan_bonus")
+
+    def __init__(self, registry: CardRegistry):
+        self.registry = registry
+        self.definition_ids = array("H")
+        self.attached_fans: Dict[int, List[int]] = {}
+        self.attached_powers: Dict[int, List[int]] = {}
+        self.stats = array("h")
+        self.fan_bonus = array("h")
+
+    def clone(self) -> "CardTable":
+        """
+        Copy only the attachment lists. Instances are all added while the
+        decks are built, so the definition id array is shared.
+        """
+        table = CardTable.__new__(CardTable)
+        table.registry = self.registry
+        table.definition_ids = self.definition_ids
+        table.attached_fans = {star_id: fans[:] for star_id, fans in self.attached_fans.items()}
+        table.attached_powers = {star_id: powers[:] for star_id, powers in self.attached_powers.items()}
+        table.stats = self.stats[:]
+        table.fan_bonus = self.fan_bonus[:]
+        return table
+
+    def add(self, definition_id: int) -> int:
+        self.definition_ids.append(definition_id)
+        self.stats.extend(self.registry.stat_rows[definition_id])
+        self.fan_bonus.append(0)
+        return len(self.definition_ids) - 1
+
+    def apply_modifiers(self, star_id: int, power_id: int, sign: int = 1) -> None:
+        """
+        Add (or with sign=-1 remove) a power's stat modifiers to the star's row.
+        """
+        row = star_id * len(STATS)
+        for i, amount in enumerate(self.registry.stat_rows[self.definition_ids[power_id]]):
+            if amount:
+                self.stats[row + i] += sign * amount
+
+    def add_fan_bonus(self, star_id: int, fan_id: int) -> None:
+        """
+        Add a fan's bonus to the star's, +1 if the star carries the fan's tag.
+        """
+        fan = self[fan_id]
+        self.fan_bonus[star_id] += fan.bonus + (1 if fan.tag in self[star_id].tags else 0)
+
+    def refresh_stats(self) -> None:
+        """
+        Rebuild the stat matrix and fan bonuses from the definitions and
+        attachments, after definition_ids or the attachments were set directly.
+        """
+        registry, definition_ids = self.registry, self.definition_ids
+        stats = self.stats = array("h")
+        stats.frombytes(registry.base_stats(definition_ids))
+        self.fan_bonus = array("h", bytes(2 * len(definition_ids)))
+        stat_rows, width = registry.stat_rows, len(STATS)
+        for star_id, power_ids in self.attached_powers.items():
+            row = star_id * width
+            values = stats[row:row + width]
+            for power_id in power_ids:
+                values = map(add, values, stat_rows[definition_ids[power_id]])
+            stats[row:row + width] = array("h", values)
+        for star_id, fan_ids in self.attached_fans.items():
+            for fan_id in fan_ids:
+                self.add_fan_bonus(star_id, fan_id)
+
+    def add_copies(self, definition_id: int, count: int) -> List[int]:
+        return [self.add(definition_id) for _ in range(count)]
+
+    def __getitem__(self, instance_id: int) -> Any:
+        return self.registry.definitions[self.definition_ids[instance_id]]
+
+    def __len__(self) -> int:
+        return len(self.definition_ids)
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from engine.models.deck import Deck
+from engine.models.player import Player
+from engine.models.registry import CardTable
+
+
+@dataclass
+class GameState:
+    """
+    Everything that changes during one game. Card definitions are shared
+    and never part of the state; cards are referenced by instance id.
+    """
+    players: List[Player]
+    main_deck: Deck
+    event_deck: Deck
+    fan_deck: Deck
+    cards: CardTable
+    turn: int = 1
+    current_player: int = 0
+    stars_played: int = 0
+    powers_played: int = 0
+    contests: int = 0
+    game_over: bool = False
+    winner: Optional[int] = None
+    pending_card: Optional[Dict[str, Any]] = None
+    pending_event: Optional[int] = None
+    # Incremental Zobrist hash of card placement, kept up to date only
+    # while the engine has a hasher attached
+    zobrist: int = 0
+    # Goes up by one for every accepted command
+    version: int = 0
+    # Contests won by each player, per stat in engine.rules.event_ops.STATS order
+    stat_wins: List[List[int]] = field(default_factory=list)
+    # Running fan totals per player, overall and by fan tag ("" for untagged),
+    # kept by engine.rules.fan_ops.award_fan
+    fan_totals: List[int] = field(default_factory=list)
+    tag_fans: List[Dict[str, int]] = field(default_factory=list)
+
+    def clone(self) -> "GameState":
+        """
+        Independent copy for search. Decks are copy-on-write and card
+        definitions are shared, so only hands, boards and attachment
+        lists are actually copied.
+        """
+        return GameState(
+            players=[
+                Player(p.name, p.is_human, p.hand[:], p.star_cards[:], p.locations[:])
+                for p in self.players
+            ],
+            main_deck=self.main_deck.clone(),
+            event_deck=self.event_deck.clone(),
+            fan_deck=self.fan_deck.clone(),
+            cards=self.cards.clone(),
+            turn=self.turn,
+            current_player=self.current_player,
+            stars_played=self.stars_played,
+            powers_played=self.powers_played,
+            contests=self.contests,
+            game_over=self.game_over,
+            winner=self.winner,
+            pending_card=dict(self.pending_card) if self.pending_card else None,
+            pending_event=self.pending_event,
+            zobrist=self.zobrist,
+            version=self.version,
+            stat_wins=[wins[:] for wins in self.stat_wins],
+            fan_totals=self.fan_totals[:],
+            tag_fans=[dict(tags) for tags in self.tag_fans],
+        )
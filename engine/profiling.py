@@ -0,0 +1,141 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Opt-in per-phase timing for GameEngine. GameEngine.profile(profiler)
+# replaces the engine's phase methods on that one instance with timed
+# wrappers, so an engine that is not profiled runs the plain methods and
+# pays nothing. Phases nest: a command's time includes the draws and the
+# contest it ran, and the summary also shows each phase's self time.
+
+# Engine method -> phase name
+PHASES = {
+    "snapshot": "snapshot",
+    "_play_card": "play_card",
+    "_end_turn": "end_turn",
+    "_choose_stat": "choose_stat",
+    "_run_contest": "contest",
+    "_next_turn": "next_turn",
+    "_draw": "draw",
+}
+
+
+class PhaseProfiler:
+    """
+    Wall time and call counts per phase. Commands are timed as
+    "command:<type>". With chrome_trace, every call is also kept as a
+    complete event for chrome_trace() (chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, chrome_trace: bool = False, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, float] = {}
+        self.self_times: Dict[str, float] = {}
+        self.trace_events: Optional[List[Dict[str, Any]]] = [] if chrome_trace else None
+        self._children: List[float] = []
+        self._origin = clock()
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """
+        `func` wrapped so every call is timed as phase `name`.
+        """
+        def timed_call(*args, **kwargs):
+            start = self._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(name, start)
+        return timed_call
+
+    def timed_command(self, apply: Callable[[Dict[str, Any]], bool]) -> Callable[[Dict[str, Any]], bool]:
+        def timed_apply(command: Dict[str, Any]) -> bool:
+            start = self._enter()
+            try:
+                return apply(command)
+            finally:
+                self._exit(f"command:{command.get('type')}", start)
+        return timed_apply
+
+    def phase(self, name: str) -> "_Phase":
+        """
+        Context manager timing a block as phase `name`, for code outside the engine.
+        """
+        return _Phase(self, name)
+
+    def _enter(self) -> float:
+        self._children.append(0.0)
+        return self.clock()
+
+    def _exit(self, name: str, start: float) -> None:
+        elapsed = self.clock() - start
+        children = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.totals[name] = self.totals.get(name, 0.0) + elapsed
+        self.self_times[name] = self.self_times.get(name, 0.0) + elapsed - children
+        if self.trace_events is not None:
+            self.trace_events.append({
+                "name": name,
+                "cat": name.split(":")[0],
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": elapsed * 1e6,
+                "pid": 1,
+                "tid": 1,
+            })
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per phase, by total time, longest first.
+        """
+        return [
+            {
+                "phase": name,
+                "calls": self.counts[name],
+                "total_ms": total * 1e3,
+                "self_ms": self.self_times[name] * 1e3,
+                "mean_us": total / self.counts[name] * 1e6,
+            }
+            for name, total in sorted(self.totals.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+    def format_summary(self) -> str:
+        lines = [f"{'phase':<24}{'calls':>10}{'total ms':>12}{'self ms':>12}{'mean us':>12}"]
+        for row in self.summary():
+            lines.append(f"{row['phase']:<24}{row['calls']:>10,}{row['total_ms']:>12.2f}"
+                         f"{row['self_ms']:>12.2f}{row['mean_us']:>12.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        if self.trace_events is None:
+            raise ValueError("This profiler was created without chrome_trace=True")
+        return {"traceEvents": self.trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.totals.clear()
+        self.self_times.clear()
+        if self.trace_events is not None:
+            self.trace_events.clear()
+        self._origin = self.clock()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: PhaseProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "_Phase":
+        self.start = self.profiler._enter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler._exit(self.name, self.start)
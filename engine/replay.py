@@ -0,0 +1,195 @@
+import base64
+import bisect
+import json
+import logging
+from typing import Any, Dict, List, Optional, TextIO
+
+from engine.codec import decode_state, encode_state
+from engine.game_engine import GameEngine
+from engine.models.registry import CardRegistry
+from engine.models.state import GameState
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EVERY = 50
+
+
+class ReplayError(RuntimeError):
+    pass
+
+
+class ActionLog:
+    """
+    Append-only record of one game: every accepted command with the cards
+    it drew, plus an encoded state checkpoint at the start and every
+    `checkpoint_every` commands. With a path the log is also written as
+    JSON lines as it grows, so a crashed session still leaves a usable log.
+    The file must not exist yet.
+
+    Entry i moves the game from version start_version + i to the next one.
+    """
+
+    def __init__(self, path: Optional[str] = None, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.entries: List[Dict[str, Any]] = []
+        # version -> (turn, encoded state)
+        self.checkpoints: Dict[int, tuple] = {}
+        self.start_version: Optional[int] = None
+        self._file: Optional[TextIO] = None
+        if path:
+            # One game per file: load() could not tell two games apart
+            try:
+                self._file = open(path, "x", encoding="utf-8")
+            except FileExistsError:
+                raise ReplayError(f"{path} already exists; action logs hold a single game") from None
+
+    def start(self, state: GameState) -> None:
+        if self.start_version is not None:
+            raise ReplayError("This log has already recorded a game")
+        self.start_version = state.version
+        self._checkpoint(state)
+
+    def append(self, command: Dict[str, Any], draws: List[List[int]], state: GameState) -> None:
+        entry = {"version": state.version, "turn": state.turn, "command": command, "draws": draws}
+        self.entries.append(entry)
+        self._write(entry)
+        if (state.version - self.start_version) % self.checkpoint_every == 0:
+            self._checkpoint(state)
+
+    def _checkpoint(self, state: GameState) -> None:
+        encoded = encode_state(state)
+        self.checkpoints[state.version] = (state.turn, encoded)
+        self._write({
+            "checkpoint": state.version,
+            "turn": state.turn,
+            "state": base64.b64encode(encoded).decode("ascii"),
+        })
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is not None:
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def end_version(self) -> int:
+        return self.start_version + len(self.entries)
+
+    @classmethod
+    def load(cls, path: str) -> "ActionLog":
+        """
+        Read a log written with a path. The returned log is not reopened
+        for writing.
+        """
+        log = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "checkpoint" in record:
+                    if log.start_version is None:
+                        log.start_version = record["checkpoint"]
+                    log.checkpoints[record["checkpoint"]] = (record["turn"], base64.b64decode(record["state"]))
+                else:
+                    log.entries.append(record)
+        if log.start_version is None:
+            raise ReplayError(f"{path} has no starting checkpoint")
+        return log
+
+
+class ReplayEngine:
+    """
+    Rebuilds a recorded game at any version or turn by decoding the nearest
+    checkpoint at or before it and replaying the logged commands forward.
+    Replayed draws are checked against the log, so a rules change that
+    alters the game is reported instead of silently replaying a different one.
+    """
+
+    def __init__(self, log: ActionLog, registry: CardRegistry, config: Optional[Dict[str, Any]] = None):
+        self.log = log
+        self.registry = registry
+        self.config = config
+        self.engine: Optional[GameEngine] = None
+        self._versions = sorted(log.checkpoints)
+
+    @property
+    def version(self) -> Optional[int]:
+        return self.engine.state.version if self.engine is not None else None
+
+    def seek(self, version: int) -> GameEngine:
+        """
+        The game at `version`. The returned engine is reused by later seeks,
+        so it must not be played on; clone it first.
+        """
+        log = self.log
+        if not log.start_version <= version <= log.end_version:
+            raise ReplayError(f"Version {version} is outside the log ({log.start_version}..{log.end_version})")
+
+        checkpoint = self._versions[bisect.bisect_right(self._versions, version) - 1]
+        current = self.version
+        # Keep going from where we are when that is closer than the checkpoint
+        if current is None or not checkpoint <= current <= version:
+            logger.info("Replaying from the checkpoint at version %d", checkpoint)
+            state = decode_state(log.checkpoints[checkpoint][1], self.registry)
+            self.engine = GameEngine.from_state(state, self.config)
+        while self.engine.state.version < version:
+            self.step()
+        return self.engine
+
+    def seek_turn(self, turn: int) -> GameEngine:
+        """
+        The game as it was when `turn` began, or its last state if it ended earlier.
+        """
+        log = self.log
+        versions = [version for version, (checkpoint_turn, _) in log.checkpoints.items() if checkpoint_turn >= turn]
+        target = min(versions) if versions else log.end_version
+        for entry in log.entries:
+            if entry["turn"] >= turn:
+                target = min(target, entry["version"])
+                break
+        return self.seek(target)
+
+    def step(self) -> bool:
+        """
+        Replay the next logged command. Returns False at the end of the log.
+        """
+        if self.engine is None:
+            self.seek(self.log.start_version)
+        engine = self.engine
+        index = engine.state.version - self.log.start_version
+        if index >= len(self.log.entries):
+            return False
+
+        entry = self.log.entries[index]
+        engine._draws = []
+        if not engine.apply(entry["command"]):
+            raise ReplayError(f"Logged command was rejected at version {engine.state.version}: {entry['command']}")
+        if engine._draws != entry["draws"]:
+            raise ReplayError(f"Replay diverged at version {engine.state.version}: "
+                              f"drew {engine._draws}, log has {entry['draws']}")
+        return True
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.deck_builder import load_catalog_or_refresh
+
+    parser = argparse.ArgumentParser(description="Rebuild a logged game and print its snapshot")
+    parser.add_argument("log")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--version", type=int)
+    target.add_argument("--turn", type=int)
+    args = parser.parse_args()
+
+    replay = ReplayEngine(ActionLog.load(args.log), load_catalog_or_refresh().registry())
+    if args.turn is not None:
+        engine = replay.seek_turn(args.turn)
+    else:
+        engine = replay.seek(args.version if args.version is not None else replay.log.end_version)
+    print(json.dumps(engine.snapshot(), indent=2))
@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional, Tuple
+from resources.config import GAME_CONFIG
+from engine.models.registry import STAR, TARGETED_POWER
+from engine.rules.event_ops import STATS, STAT_INDEX
+
+# Actions are small ints: the kind in the low 2 bits, then the hand index
+# (or stat index for CHOOSE_STAT) in the next 8 and the target star index
+# above that. They are only meaningful for the state they were generated
+# from, since hand positions shift as cards are played.
+END_TURN, CHOOSE_STAT, PLAY_STAR, ATTACH_POWER = range(4)
+_INDEX_SHIFT = 2
+_STAR_SHIFT = 10
+
+def encode_action(kind: int, index: int = 0, star_index: int = 0) -> int:
+    return kind | index << _INDEX_SHIFT | star_index << _STAR_SHIFT
+
+def decode_action(action: int) -> Tuple[int, int, int]:
+    """
+    (kind, hand or stat index, star index)
+    """
+    return action & 0b11, action >> _INDEX_SHIFT & 0xFF, action >> _STAR_SHIFT
+
+def legal_actions(state: Any, player_index: int, config: Optional[Dict[str, Any]] = None) -> List[int]:
+    """
+    Every action the player can take right now: a stat choice while a
+    contest is pending, otherwise each star they may play, each power on
+    each of their stars, and ending the turn (always last).
+    """
+    if state.game_over or player_index != state.current_player:
+        return []
+    if state.pending_event is not None:
+        return [CHOOSE_STAT | STAT_INDEX[stat] << _INDEX_SHIFT
+                for stat in state.cards[state.pending_event].stat_options]
+
+    config = config or GAME_CONFIG
+    player = state.players[player_index]
+    kinds = state.cards.registry.play_kinds
+    definition_ids = state.cards.definition_ids
+    can_play_star = state.stars_played < config["star_cards_per_turn_limit"]
+    star_count = len(player.star_cards)
+    can_play_power = star_count > 0 and state.powers_played < config["power_cards_per_turn_limit"]
+
+    actions = []
+    for i, card_id in enumerate(player.hand):
+        kind = kinds[definition_ids[card_id]]
+        if kind == STAR:
+            if can_play_star:
+                actions.append(PLAY_STAR | i << _INDEX_SHIFT)
+        elif kind == TARGETED_POWER and can_play_power:
+            action = ATTACH_POWER | i << _INDEX_SHIFT
+            actions.extend(action | k << _STAR_SHIFT for k in range(star_count))
+    actions.append(END_TURN)
+    return actions
+
+def action_matches_card(action: int, state: Any) -> bool:
+    """
+    Whether a card play names a card of the right kind for the current
+    player (a star for PLAY_STAR, a targeted power for ATTACH_POWER).
+    The engine checks everything else when the command is applied.
+    """
+    kind, index, _ = decode_action(action)
+    if kind != PLAY_STAR and kind != ATTACH_POWER:
+        return True
+    hand = state.players[state.current_player].hand
+    if index >= len(hand):
+        return False
+    card_kind = state.cards.registry.play_kinds[state.cards.definition_ids[hand[index]]]
+    return card_kind == (STAR if kind == PLAY_STAR else TARGETED_POWER)
+
+def action_command(action: int, state: Any, player_index: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The engine command for an action (by default the current player's).
+    Cards are named by instance id, so the command stays valid if the hand
+    is reordered.
+    """
+    if player_index is None:
+        player_index = state.current_player
+    kind, index, star_index = decode_action(action)
+    if kind == END_TURN:
+        return {"type": "END_TURN", "payload": {"player": player_index}}
+    if kind == CHOOSE_STAT:
+        return {"type": "CHOOSE_STAT", "payload": {"player": player_index, "stat": STATS[index]}}
+    payload = {"player": player_index, "card_id": state.players[player_index].hand[index]}
+    if kind == ATTACH_POWER:
+        payload["star_index"] = star_index
+    return {"type": "PLAY_CARD", "payload": payload}
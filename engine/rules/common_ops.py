@@ -1,31 +1,29 @@
 import logging
+from typing import Optional
 from engine.models.cards import StarCard, PowerCard
+from engine.models.registry import CardTable
 from engine.rules.star_ops import play_star_from_hand
+from engine.rules.power_ops import attach_power_from_hand
 
 logger = logging.getLogger(__name__)
 
-def play_card_from_hand(player, hand_index: int):
+def play_card_from_hand(player, hand_index: int, cards: CardTable, star_index: Optional[int] = None):
     if hand_index is None:
         logger.info("Missing hand_index")
-        return
+        return None
 
     if hand_index < 0 or hand_index >= len(player.hand):
         logger.info("Invalid hand index")
-        return
+        return None
 
-    card = player.hand[hand_index]
+    card = cards[player.hand[hand_index]]
 
     if isinstance(card, StarCard):
-        return play_star_from_hand(player, hand_index)
+        return play_star_from_hand(player, hand_index, cards)
 
     elif isinstance(card, PowerCard):
-        # Placeholder: wire this when power cards are ready
-        logger.info(f"Playing PowerCard not implemented yet: {getattr(card, 'name', 'Unknown')}")
-        return
-        # Example for later:
-        # target_star_index = kwargs.get("target_star_index")
-        # return play_power_from_hand(player, hand_index, target_star_index=target_star_index)
+        return attach_power_from_hand(player, hand_index, star_index, cards)
 
     else:
-        logger.info(f"Unknown or unsupported card type: {type(card).__name__}")
-        return
\ No newline at end of file
+        logger.info("Unknown or unsupported card type: %s", type(card).__name__)
+        return None
@@ -1,30 +1,58 @@
 import random
-from typing import List, Any
+from typing import List, Any, Optional
 from engine.models.deck import Deck
 import logging
 
 logger = logging.getLogger(__name__)
 
-def shuffle_deck(deck: Deck) -> None:
-    random.shuffle(deck.cards)
+# Drawn cards are trimmed off the front once they are at least this many
+# and make up half the list, keeping draws amortized O(1)
+COMPACT_AT = 64
+
+def _own_cards(deck: Deck) -> None:
+    """
+    Give a cloned deck its own list before changing the list in place.
+    """
+    if deck.shared:
+        deck.cards = deck.cards[deck.cursor:]
+        deck.cursor = 0
+        deck.shared = False
+
+def shuffle_deck(deck: Deck, rng: Optional[random.Random] = None) -> None:
+    remaining = deck.cards[deck.cursor:] if deck.cursor or deck.shared else deck.cards
+    (rng or random).shuffle(remaining)
+    deck.cards = remaining
+    deck.cursor = 0
+    deck.shared = False
 
 def draw_card(deck: Deck) -> Any | None:
-    logger.info(f"Drawing card from {deck.name} with {len(deck.cards)} cards")
-    if not deck.cards:
+    cursor = deck.cursor
+    if cursor >= len(deck.cards):
         return None
-    return deck.cards.pop(0)
+    card = deck.cards[cursor]
+    cursor += 1
+    if cursor >= COMPACT_AT and cursor * 2 >= len(deck.cards) and not deck.shared:
+        del deck.cards[:cursor]
+        cursor = 0
+    deck.cursor = cursor
+    return card
 
 def add_card(deck: Deck, card: Any) -> None:
+    _own_cards(deck)
     deck.cards.append(card)
 
 def add_many_cards(deck: Deck, cards: List[Any]) -> None:
+    _own_cards(deck)
     deck.cards.extend(cards)
 
 def peek_cards(deck: Deck, count: int = 1) -> List[Any]:
-    return deck.cards[:count]
+    return deck.cards[deck.cursor:deck.cursor + count]
+
+def remaining_cards(deck: Deck) -> List[Any]:
+    return deck.cards[deck.cursor:]
 
 def deck_size(deck: Deck) -> int:
-    return len(deck.cards)
+    return len(deck.cards) - deck.cursor
 
 def is_deck_empty(deck: Deck) -> bool:
-    return len(deck.cards) == 0
+    return deck.cursor >= len(deck.cards)
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Sequence, Tuple
+from engine.models.cards import STATS, StatContestEvent
+from engine.models.registry import CardTable
+
+STAT_INDEX = {stat: i for i, stat in enumerate(STATS)}
+STAT_COUNT = len(STATS)
+
+def effective_stat(star_id: int, stat: str, cards: CardTable) -> int:
+    """
+    Base stat plus every attached stat modifier, floored at zero. Read from
+    the card table's stat matrix, which is kept up to date on attach.
+    """
+    return max(0, cards.stats[star_id * STAT_COUNT + STAT_INDEX[stat]])
+
+def effective_stats(star_id: int, cards: CardTable) -> Dict[str, int]:
+    row = star_id * STAT_COUNT
+    return {stat: max(0, value) for stat, value in zip(STATS, cards.stats[row:row + STAT_COUNT])}
+
+def contest_star(player: Any, stat: str, cards: CardTable) -> int | None:
+    """
+    Instance id of the player's strongest star for the stat.
+    """
+    return _contest_entry(player, STAT_INDEX[stat], cards)[0]
+
+def _contest_entry(player: Any, column: int, cards: CardTable) -> Tuple[int | None, int]:
+    stats = cards.stats
+    best_id, best_value = None, -1
+    for star_id in player.star_cards:
+        value = max(0, stats[star_id * STAT_COUNT + column])
+        if value > best_value:
+            best_id, best_value = star_id, value
+    return best_id, best_value
+
+def needs_stat_choice(event: StatContestEvent) -> bool:
+    return len(event.stat_options) > 1
+
+def resolve_contest(players: List[Any], stat: str, cards: CardTable) -> List[Tuple[int, int]]:
+    """
+    Every player contests with their strongest star in the stat.
+    Returns (player_index, star_id) for each winner; ties share the win.
+    """
+    column = STAT_INDEX[stat]
+    entries = []
+    for i, player in enumerate(players):
+        star_id, value = _contest_entry(player, column, cards)
+        if star_id is not None:
+            entries.append((i, star_id, value))
+
+    if not entries:
+        return []
+
+    max_value = max(value for _, _, value in entries)
+    return [(i, star_id) for i, star_id, value in entries if value == max_value]
+
+def resolve_contests(states: Sequence[Any], stats: Sequence[str],
+                     use_numpy: bool = False) -> List[List[Tuple[int, int]]]:
+    """
+    resolve_contest for a batch of games at once, e.g. the pending contest
+    of every game in a lockstep simulation. With use_numpy (and NumPy
+    installed) the whole batch is reduced as one array; with a handful of
+    stars per player, gathering the array costs more than it saves, so
+    the plain loop is the default.
+    """
+    if use_numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        if numpy is not None:
+            return _resolve_contests_numpy(numpy, states, stats)
+    return [resolve_contest(state.players, stat, state.cards) for state, stat in zip(states, stats)]
+
+def _resolve_contests_numpy(numpy: Any, states: Sequence[Any], stats: Sequence[str]) -> List[List[Tuple[int, int]]]:
+    players = max((len(state.players) for state in states), default=0)
+    width = max((len(player.star_cards) for state in states for player in state.players), default=0)
+    if width == 0:
+        return [[] for _ in states]
+
+    # (game, player, star slot), padded with -1 where a player has fewer
+    # stars. Gathered into flat lists first: one NumPy call per game costs
+    # more than the whole contest does.
+    slots, star_ids, values = [], [], []
+    for g, (state, stat) in enumerate(zip(states, stats)):
+        matrix, column = state.cards.stats, STAT_INDEX[stat]
+        for p, player in enumerate(state.players):
+            base = (g * players + p) * width
+            for slot, star_id in enumerate(player.star_cards):
+                slots.append(base + slot)
+                star_ids.append(star_id)
+                values.append(matrix[star_id * STAT_COUNT + column])
+    shape = (len(states), players, width)
+    flat_ids = numpy.full(shape[0] * players * width, -1, dtype=numpy.int64)
+    flat_values = numpy.full(shape[0] * players * width, -1, dtype=numpy.int32)
+    flat_ids[slots] = star_ids
+    flat_values[slots] = numpy.maximum(values, 0)
+    star_ids, values = flat_ids.reshape(shape), flat_values.reshape(shape)
+
+    # argmax picks the first of equal stars, like contest_star
+    best = values.argmax(axis=2)[..., None]
+    best_values = numpy.take_along_axis(values, best, axis=2)[..., 0]
+    best_ids = numpy.take_along_axis(star_ids, best, axis=2)[..., 0]
+    winners = (best_values == best_values.max(axis=1, keepdims=True)) & (best_values >= 0)
+    return [
+        [(int(p), int(best_ids[g, p])) for p in numpy.flatnonzero(winners[g])]
+        for g in range(len(states))
+    ]
@@ -0,0 +1,61 @@
+from typing import Any, Dict, List
+from engine.models.registry import CardTable
+
+def attach_fan(star_id: int, fan_id: int, cards: CardTable) -> None:
+    cards.attached_fans.setdefault(star_id, []).append(fan_id)
+    cards.add_fan_bonus(star_id, fan_id)
+
+def star_fan_bonus(star_id: int, cards: CardTable) -> int:
+    """
+    Fans attached to a star, with +1 for each fan whose tag the star carries.
+    Kept up to date by attach_fan.
+    """
+    return cards.fan_bonus[star_id]
+
+def player_fans(player: Any, cards: CardTable) -> int:
+    return sum(star_fan_bonus(star_id, cards) for star_id in player.star_cards)
+
+def award_fan(state: Any, player_index: int, star_id: int, fan_id: int) -> int:
+    """
+    Attach a fan to one of the player's stars and add what it is worth to
+    the player's running totals. Returns the player's new fan total.
+    """
+    cards = state.cards
+    before = cards.fan_bonus[star_id]
+    attach_fan(star_id, fan_id, cards)
+    gained = cards.fan_bonus[star_id] - before
+
+    state.fan_totals[player_index] += gained
+    tag_fans = state.tag_fans[player_index]
+    tag = cards[fan_id].tag or ""
+    tag_fans[tag] = tag_fans.get(tag, 0) + gained
+    return state.fan_totals[player_index]
+
+def refresh_fan_totals(state: Any) -> None:
+    """
+    Recompute every player's running fan totals from their stars.
+    """
+    cards = state.cards
+    fan_bonus, attached_fans = cards.fan_bonus, cards.attached_fans
+    state.fan_totals = [sum([fan_bonus[star_id] for star_id in player.star_cards]) for player in state.players]
+    state.tag_fans = []
+    for player in state.players:
+        tag_fans: Dict[str, int] = {}
+        for star_id in player.star_cards:
+            if star_id not in attached_fans:
+                continue
+            tags = cards[star_id].tags
+            for fan_id in attached_fans[star_id]:
+                fan = cards[fan_id]
+                tag = fan.tag or ""
+                tag_fans[tag] = tag_fans.get(tag, 0) + fan.bonus + (1 if fan.tag in tags else 0)
+        state.tag_fans.append(tag_fans)
+
+def leading_player(fan_totals: List[int]) -> int | None:
+    """
+    Index of the player with the most fans, or None on a tie.
+    """
+    best = max(fan_totals)
+    if fan_totals.count(best) > 1:
+        return None
+    return fan_totals.index(best)
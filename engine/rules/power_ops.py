@@ -0,0 +1,36 @@
+from engine.models.cards import PowerCard
+from engine.models.registry import CardTable
+import logging
+
+logger = logging.getLogger(__name__)
+
+def attach_power(star_id: int, power_id: int, cards: CardTable) -> None:
+    cards.attached_powers.setdefault(star_id, []).append(power_id)
+    cards.apply_modifiers(star_id, power_id)
+
+def detach_power(star_id: int, power_id: int, cards: CardTable) -> bool:
+    powers = cards.attached_powers.get(star_id)
+    if not powers or power_id not in powers:
+        logger.info("Power %s is not attached to star %s", power_id, star_id)
+        return False
+    powers.remove(power_id)
+    if not powers:
+        del cards.attached_powers[star_id]
+    cards.apply_modifiers(star_id, power_id, sign=-1)
+    return True
+
+def attach_power_from_hand(player, hand_index: int, star_index: int, cards: CardTable):
+    card_id = player.hand[hand_index]
+    card = cards[card_id]
+    if not isinstance(card, PowerCard) or not card.targets_star:
+        logger.info("Cannot attach non-targeting card: %s", getattr(card, "name", "Unknown"))
+        return None
+
+    if star_index is None or star_index < 0 or star_index >= len(player.star_cards):
+        logger.info("Invalid star index for %s", card.name)
+        return None
+
+    star_id = player.star_cards[star_index]
+    player.hand.pop(hand_index)
+    attach_power(star_id, card_id, cards)
+    return card_id
@@ -1,14 +1,16 @@
 from engine.models.cards import StarCard
+from engine.models.registry import CardTable
 import logging
 
 logger = logging.getLogger(__name__)
 
-def play_star_from_hand(player, hand_index: int):
-    card = player.hand[hand_index]
+def play_star_from_hand(player, hand_index: int, cards: CardTable):
+    card_id = player.hand[hand_index]
+    card = cards[card_id]
     if not isinstance(card, StarCard):
-        logger.info(f"Cannot play non-star card: {getattr(card, 'name', 'Unknown')}")
-        return
+        logger.info("Cannot play non-star card: %s", getattr(card, "name", "Unknown"))
+        return None
 
     player.hand.pop(hand_index)
-    player.star_cards.append(card)
-    logger.info(f"{player.name} played {card.name}")
\ No newline at end of file
+    player.star_cards.append(card_id)
+    return card_id
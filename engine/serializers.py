@@ -1,9 +1,13 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
 from engine.models.cards import StarCard, PowerCard, ModifyStatCard
+from engine.models.registry import CardTable
+from engine.rules.actions import ATTACH_POWER, PLAY_STAR, decode_action
+from engine.rules.event_ops import effective_stats
+from engine.rules.fan_ops import star_fan_bonus
 
-def star_card_view(card) -> dict:
+def star_card_view(card, card_id: int) -> dict:
     return {
-        "id": getattr(card, "id", None),
+        "id": card_id,
         "type": "StarCard",
         "name": getattr(card, "name", "Star"),
         "aura": getattr(card, "aura", 0),
@@ -12,62 +16,124 @@ def star_card_view(card) -> dict:
         "legacy": getattr(card, "legacy", 0),
     }
 
-def power_card_view(card) -> dict:
+def power_card_view(card, card_id: int) -> dict:
     return {
-        "id": getattr(card, "id", None),
+        "id": card_id,
         "type": "ModifyStatCard" if isinstance(card, ModifyStatCard) else "PowerCard",
         "name": getattr(card, "name", "Power"),
         "description": getattr(card, "description", ""),
         "targets_star": getattr(card, "targets_star", False),
-        "stat_modifiers": getattr(card, "stat_modifiers", {}),
+        "stat_modifiers": dict(getattr(card, "stat_modifiers", ())),
     }
 
-def player_view(player: Any, player_index: int = 0) -> Dict[str, Any]:
-    has_star_cards = bool(getattr(player, "star_cards", []))
+def card_view(card, card_id: int) -> dict:
+    if isinstance(card, StarCard):
+        return star_card_view(card, card_id)
+    if isinstance(card, PowerCard):
+        return power_card_view(card, card_id)
+    return {"id": card_id, "type": card.__class__.__name__, "name": getattr(card, "name", "Card")}
 
-    hand_views = []
-    for i, c in enumerate(getattr(player, "hand", [])):
-        # Build per-type payload
-        if isinstance(c, StarCard):
-            v = star_card_view(c)
-            # Human can play stars from hand
-            if player_index == 0:
-                v["show_button"] = True
-                v["button_label"] = "Play"
-                v["button_command"] = {
-                    "type": "PLAY_CARD",
-                    "payload": {"player": player_index, "hand_index": i}
-                }
-            else:
-                v["show_button"] = False
+def static_card_view(cards: CardTable, card_id: int) -> Dict[str, Any]:
+    """
+    View of a card's definition. Definitions never change, so it is built
+    once per definition and shared by every copy in every game built from
+    the registry; callers must not mutate it.
+    """
+    definition_id = cards.definition_ids[card_id]
+    views = cards.registry.views
+    view = views.get(definition_id)
+    if view is None:
+        view = views[definition_id] = card_view(cards.registry[definition_id], definition_id)
+    return view
 
-        elif isinstance(c, PowerCard):
-            v = power_card_view(c)
-            # Human can only play powers if they already have a star on board
-            if player_index == 0 and has_star_cards and v.get("targets_star", False):
-                v["show_button"] = True
-                v["button_label"] = "Play"
-                v["button_command"] = {
-                    "type": "PLAY_CARD",
-                    "payload": {"player": player_index, "hand_index": i}
-                }
-            else:
-                v["show_button"] = False
+def instance_card_view(cards: CardTable, card_id: int) -> Dict[str, Any]:
+    return {**static_card_view(cards, card_id), "id": card_id}
 
+def hand_card_view(cards: CardTable, card_id: int, buttons: Sequence[Dict[str, Any]] = ()) -> Dict[str, Any]:
+    """
+    A card in hand, with one button per legal way to play it.
+    """
+    return {**static_card_view(cards, card_id), "id": card_id, "show_button": bool(buttons), "buttons": list(buttons)}
+
+def hand_buttons(player: Any, cards: CardTable, player_index: int, actions: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Buttons for the card plays among `actions` (from legal_actions), by hand index.
+    """
+    buttons: Dict[int, List[Dict[str, Any]]] = {}
+    for action in actions:
+        kind, hand_index, star_index = decode_action(action)
+        if kind != PLAY_STAR and kind != ATTACH_POWER:
+            continue
+        payload = {"player": player_index, "card_id": player.hand[hand_index]}
+        if kind == PLAY_STAR:
+            label = "Play"
         else:
-            # Fallback for unknown types
-            v = {"id": getattr(card, "id", None), "type": c.__class__.__name__, "name": getattr(c, "name", "Card"), "show_button": False}
+            label = f"On {cards[player.star_cards[star_index]].name}"
+            payload["star_index"] = star_index
+        buttons.setdefault(hand_index, []).append({"label": label, "command": {"type": "PLAY_CARD", "payload": payload}})
+    return buttons
 
-        hand_views.append(v)
+def board_star_view(cards: CardTable, star_id: int) -> Dict[str, Any]:
+    # Stars on the board show their stats with attached powers applied
+    return {
+        **static_card_view(cards, star_id),
+        **effective_stats(star_id, cards),
+        "id": star_id,
+        "fans": len(cards.attached_fans.get(star_id, ())),
+        "fan_bonus": star_fan_bonus(star_id, cards),
+        "powers": len(cards.attached_powers.get(star_id, ())),
+    }
 
+def player_view(player: Any, cards: CardTable, player_index: int = 0, actions: Sequence[int] = ()) -> Dict[str, Any]:
+    """
+    `actions` are the player's legal actions; pass none to show the hand
+    without play buttons, e.g. for a computer player or off turn.
+    """
+    buttons = hand_buttons(player, cards, player_index, actions)
     return {
         "name": getattr(player, "name", "Player"),
-        "hand": hand_views,
-        "stars": [star_card_view(s) for s in getattr(player, "star_cards", [])],
+        "hand": [hand_card_view(cards, card_id, buttons.get(i, ())) for i, card_id in enumerate(getattr(player, "hand", []))],
+        "stars": [board_star_view(cards, s) for s in getattr(player, "star_cards", [])],
     }
 
 def deck_view(deck: Any) -> Dict[str, Any]:
     return {
         "name": getattr(deck, "name", "Deck"),
-        "size": len(deck.cards) if hasattr(deck, "cards") else 0,
+        "size": len(deck) if hasattr(deck, "cards") else 0,
     }
+
+def seat_snapshot(snapshot: Dict[str, Any], seat: int) -> Dict[str, Any]:
+    """
+    A snapshot as seen from `seat`: other players' hands are shown only as
+    a count, and the card another player is about to attach has no id.
+    Shares everything else with `snapshot`.
+    """
+    players = []
+    for index, view in enumerate(snapshot["players"]):
+        if index == seat:
+            players.append({**view, "hand_size": len(view["hand"])})
+        else:
+            players.append({**view, "hand": [], "hand_size": len(view["hand"])})
+    pending_card = snapshot["pending_card"]
+    if pending_card and pending_card["player"] != seat:
+        pending_card = {**pending_card, "card_id": None}
+    return {**snapshot, "players": players, "pending_card": pending_card}
+
+def seat_changes(changes: List[Dict[str, Any]], seat: int, cards: CardTable) -> List[Dict[str, Any]]:
+    """
+    Delta changes as seen from `seat`. Cards going into another player's
+    hand lose their id and view; cards leaving one for the table gain the
+    view the seat has not seen yet.
+    """
+    seen = []
+    for change in changes:
+        if "card" in change:
+            source, target = change["from"], change["to"]
+            if target[0] == "hand" and target[1] != seat:
+                change = {"card": None, "from": source, "to": target}
+            elif source[0] == "hand" and source[1] != seat and "view" not in change:
+                change = {**change, "view": instance_card_view(cards, change["card"])}
+        elif change["field"] == "pending_card" and change["value"] and change["value"]["player"] != seat:
+            change = {"field": "pending_card", "value": {**change["value"], "card_id": None}}
+        seen.append(change)
+    return seen
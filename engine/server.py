@@ -0,0 +1,411 @@
+import asyncio
+import json
+import logging
+import random
+import secrets
+from typing import Any, Dict, List, Optional, Set
+
+from engine.ai.mcts import MCTSPolicy
+from engine.ai.random_policy import RandomPolicy
+from engine.game_engine import GameEngine
+from engine.serializers import seat_changes, seat_snapshot
+from engine.setup import build_card_table, build_decks, build_players, deal_starting_hands
+from utils.card_loader import CardCatalog
+
+logger = logging.getLogger(__name__)
+
+# Hosts many games in one process over TCP, one JSON object per line.
+#
+# Requests may carry an "id", which is echoed on the reply:
+#   {"type": "NEW_GAME", "payload": {"opponent": "random" | "mcts" | "none", "seed": 1}}
+#   {"type": "JOIN", "payload": {"session": "..."}}     take a free seat in a game
+#   {"type": "SNAPSHOT"}
+#   {"type": "PLAY_CARD" | "END_TURN" | "CHOOSE_STAT", "payload": {...}}
+# Game commands are the ones GameEngine.dispatch() accepts; "player" is
+# always set to the connection's seat. Replies are JOINED (session, seat,
+# snapshot), SNAPSHOT, RESULT (version, accepted) or ERROR. Every accepted
+# command, including the computer opponent's, is also sent to every
+# connection in the game as {"type": "DELTA", "version", "accepted", "changes"}.
+# Snapshots and deltas are built per seat: other players' hands show only
+# as a count, and cards they draw carry no id or view.
+#
+# Backpressure:
+# - each connection handles one request at a time, so a client cannot
+#   queue work faster than it is served, and a game has at most one
+#   request per seat waiting for its lock;
+# - each connection's outgoing messages queue up to `outbox_size`, and a
+#   client that falls further behind than that is disconnected rather
+#   than letting its backlog grow without bound.
+
+GAME_COMMANDS = ("PLAY_CARD", "END_TURN", "CHOOSE_STAT")
+# Payload fields the engine indexes with, and the one it compares as a string
+INT_FIELDS = ("hand_index", "star_index", "card_id")
+STR_FIELDS = ("stat",)
+OPPONENTS = ("random", "mcts", "none")
+MAX_LINE = 64 * 1024
+
+
+class ServerError(Exception):
+    pass
+
+
+def check_payload(payload: Dict[str, Any]) -> None:
+    """
+    Reject command payloads the engine would choke on rather than refuse.
+    """
+    for name in INT_FIELDS:
+        value = payload.get(name)
+        if value is not None and type(value) is not int:
+            raise ServerError(f"{name} must be an integer")
+    for name in STR_FIELDS:
+        value = payload.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ServerError(f"{name} must be a string")
+
+
+class Connection:
+    """
+    One client socket with a bounded outbox written by its own task.
+    """
+
+    def __init__(self, writer: asyncio.StreamWriter, outbox_size: int):
+        self.writer = writer
+        self.outbox: asyncio.Queue = asyncio.Queue(outbox_size)
+        self.session: Optional["Session"] = None
+        self.seat: Optional[int] = None
+        self.closed = False
+
+    def send(self, message: bytes) -> None:
+        if self.closed:
+            return
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.info("Dropping a client that is %d messages behind", self.outbox.qsize())
+            self.abort()
+
+    async def pump(self) -> None:
+        try:
+            while not self.writer.transport.is_closing():
+                message = await self.outbox.get()
+                if message is None:
+                    break
+                self.writer.write(message)
+                await self.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self) -> None:
+        """
+        Finish sending what is queued, then close.
+        """
+        if not self.closed:
+            self.closed = True
+            try:
+                self.outbox.put_nowait(None)
+            except asyncio.QueueFull:
+                self.abort()
+
+    def abort(self) -> None:
+        """
+        Drop the connection now, discarding anything still queued.
+        """
+        self.closed = True
+        self.writer.transport.abort()
+        if not self.outbox.full():
+            self.outbox.put_nowait(None)
+
+
+class Session:
+    """
+    One game. Everything that touches its engine holds `lock`.
+    """
+
+    def __init__(self, session_id: str, engine: GameEngine, opponent: Any, computer_seats: Set[int]):
+        self.id = session_id
+        self.engine = engine
+        self.opponent = opponent
+        self.computer_seats = computer_seats
+        self.lock = asyncio.Lock()
+        self.connections: Dict[int, Connection] = {}
+
+    def free_seat(self) -> Optional[int]:
+        for seat in range(len(self.engine.state.players)):
+            if seat not in self.computer_seats and seat not in self.connections:
+                return seat
+        return None
+
+    def snapshot(self, seat: int) -> Dict[str, Any]:
+        return seat_snapshot(self.engine.snapshot(), seat)
+
+    def broadcast(self, result: Dict[str, Any]) -> None:
+        """
+        Send a dispatch() result to every connected seat, each seeing only
+        its own hand.
+        """
+        cards = self.engine.state.cards
+        for seat, connection in list(self.connections.items()):
+            changes = seat_changes(result["changes"], seat, cards)
+            connection.send(encode({"type": "DELTA", **result, "changes": changes}))
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class GameServer:
+    """
+    Asyncio TCP server for many concurrent games. All games share the
+    catalog's CardRegistry; each has its own GameEngine. A game is
+    dropped when its last connection closes.
+    """
+
+    def __init__(self, catalog: CardCatalog, host: str = "127.0.0.1", port: int = 0,
+                 max_sessions: int = 10_000, outbox_size: int = 64,
+                 mcts_budget_ms: float = 150.0):
+        self.catalog = catalog
+        self.registry = catalog.registry()
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.outbox_size = outbox_size
+        self.mcts_budget_ms = mcts_budget_ms
+        self.sessions: Dict[str, Session] = {}
+        self.connections: Dict[Connection, asyncio.Task] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Serving games on %s:%d", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self.connections):
+                connection.abort()
+            await asyncio.gather(*self.connections.values(), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def new_engine(self, rng: random.Random, humans: int) -> GameEngine:
+        players = build_players()
+        for player in players[:humans]:
+            player.is_human = True
+        cards = build_card_table(self.catalog, self.registry)
+        main_deck, event_deck, fan_deck = build_decks(self.catalog, cards, rng)
+        deal_starting_hands(players, main_deck)
+        return GameEngine(players=players, decks=(main_deck, event_deck, fan_deck), cards=cards)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = Connection(writer, self.outbox_size)
+        self.connections[connection] = asyncio.current_task()
+        pump = asyncio.create_task(connection.pump())
+        try:
+            while not connection.closed:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    connection.send(encode({"type": "ERROR", "error": f"Requests are limited to {MAX_LINE} bytes"}))
+                    break
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                await self._request(connection, line)
+        finally:
+            self._leave(connection)
+            self.connections.pop(connection, None)
+            connection.close()
+            await pump
+
+    async def _request(self, connection: Connection, line: bytes) -> None:
+        request_id = None
+        try:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                raise ServerError("Requests must be JSON objects, one per line")
+            if not isinstance(message, dict):
+                raise ServerError("Requests must be JSON objects, one per line")
+            request_id = message.get("id")
+            payload = message.get("payload") or {}
+            if not isinstance(payload, dict):
+                raise ServerError("payload must be an object")
+
+            kind = message.get("type")
+            if kind == "NEW_GAME":
+                reply = self._new_game(connection, payload)
+            elif kind == "JOIN":
+                reply = self._join(connection, payload.get("session"))
+            elif kind == "SNAPSHOT":
+                session = self._session_of(connection)
+                async with session.lock:
+                    reply = {"type": "SNAPSHOT", "snapshot": session.snapshot(connection.seat)}
+            elif kind in GAME_COMMANDS:
+                reply = await self._command(connection, kind, payload)
+            else:
+                raise ServerError(f"Unknown request type: {kind}")
+        except ServerError as e:
+            reply = {"type": "ERROR", "error": str(e)}
+        except Exception:
+            # A bug in one game must not take the connection or the game down
+            logger.exception("Request failed: %r", line[:200])
+            reply = {"type": "ERROR", "error": "The server could not handle that request"}
+        if request_id is not None:
+            reply["id"] = request_id
+        connection.send(encode(reply))
+
+    def _session_of(self, connection: Connection) -> Session:
+        if connection.session is None:
+            raise ServerError("Start or join a game first")
+        return connection.session
+
+    def _new_game(self, connection: Connection, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if connection.session is not None:
+            raise ServerError("This connection is already in a game")
+        if len(self.sessions) >= self.max_sessions:
+            raise ServerError("The server is full")
+        opponent_name = payload.get("opponent", "random")
+        if opponent_name not in OPPONENTS:
+            raise ServerError(f"opponent must be one of {', '.join(OPPONENTS)}")
+        seed = payload.get("seed")
+        rng = random.Random(seed if isinstance(seed, int) else None)
+
+        if opponent_name == "none":
+            engine = self.new_engine(rng, humans=len(build_players()))
+            opponent, computer_seats = None, set()
+        else:
+            engine = self.new_engine(rng, humans=1)
+            if opponent_name == "mcts":
+                opponent = MCTSPolicy(rng, time_budget_ms=self.mcts_budget_ms)
+            else:
+                opponent = RandomPolicy(rng)
+            computer_seats = set(range(1, len(engine.state.players)))
+
+        session_id = secrets.token_hex(8)
+        session = self.sessions[session_id] = Session(session_id, engine, opponent, computer_seats)
+        return self._seat(connection, session, 0)
+
+    def _join(self, connection: Connection, session_id: Any) -> Dict[str, Any]:
+        if connection.session is not None:
+            raise ServerError("This connection is already in a game")
+        session = self.sessions.get(session_id) if isinstance(session_id, str) else None
+        if session is None:
+            raise ServerError(f"No such game: {session_id}")
+        seat = session.free_seat()
+        if seat is None:
+            raise ServerError("That game has no free seat")
+        return self._seat(connection, session, seat)
+
+    def _seat(self, connection: Connection, session: Session, seat: int) -> Dict[str, Any]:
+        connection.session, connection.seat = session, seat
+        session.connections[seat] = connection
+        return {"type": "JOINED", "session": session.id, "seat": seat, "snapshot": session.snapshot(seat)}
+
+    def _leave(self, connection: Connection) -> None:
+        session = connection.session
+        if session is None:
+            return
+        session.connections.pop(connection.seat, None)
+        connection.session = None
+        if not session.connections:
+            self.sessions.pop(session.id, None)
+
+    async def _command(self, connection: Connection, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        session = self._session_of(connection)
+        check_payload(payload)
+        async with session.lock:
+            engine = session.engine
+            result = engine.dispatch({"type": kind, "payload": {**payload, "player": connection.seat}})
+            if result["accepted"]:
+                session.broadcast(result)
+                await self._play_computer(session)
+        return {"type": "RESULT", "version": result["version"], "accepted": result["accepted"]}
+
+    async def _play_computer(self, session: Session) -> None:
+        """
+        Let the computer opponent move until it is a connected player's turn.
+        MCTS searches run on a worker thread so other games keep being served.
+        """
+        engine, opponent = session.engine, session.opponent
+        state = engine.state
+        loop = asyncio.get_running_loop()
+        while opponent is not None and not state.game_over and state.current_player in session.computer_seats:
+            player_index = state.current_player
+            if isinstance(opponent, MCTSPolicy):
+                command = await loop.run_in_executor(None, opponent.choose, engine, player_index)
+            else:
+                command = opponent.choose(engine, player_index)
+            result = engine.dispatch(command)
+            if not result["accepted"]:
+                logger.info("Opponent chose an illegal command: %s", command)
+                return
+            session.broadcast(result)
+
+
+class GameServerClient:
+    """
+    Minimal client for a GameServer, for tests and tools. request() waits
+    for the reply to its own request; DELTA messages that arrive meanwhile
+    are kept in `updates`.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.updates: List[Dict[str, Any]] = []
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 0) -> "GameServerClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE * 16)
+        return cls(reader, writer)
+
+    async def request(self, kind: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._next_id += 1
+        request_id = self._next_id
+        self.writer.write(encode({"id": request_id, "type": kind, "payload": payload or {}}))
+        await self.writer.drain()
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection")
+            message = json.loads(line)
+            if message.get("id") == request_id:
+                return message
+            self.updates.append(message)
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+    from utils.deck_builder import load_catalog_or_refresh
+
+    parser = argparse.ArgumentParser(description="Host Star Power games over TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-sessions", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("engine.game_engine").setLevel(logging.WARNING)
+    server = GameServer(load_catalog_or_refresh(), args.host, args.port, max_sessions=args.max_sessions)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
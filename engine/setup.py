@@ -1,9 +1,12 @@
-from typing import List, Tuple
+import random
+from typing import List, Tuple, Optional
 from resources.config import GAME_CONFIG
 from engine.models.player import Player
 from engine.models.deck import Deck
-from engine.rules.deck_ops import draw_card
-from utils.deck_builder import build_decks as deck_builder
+from engine.models.registry import CardRegistry, CardTable
+from engine.rules.deck_ops import draw_card, remaining_cards
+from utils.card_loader import CardCatalog
+from utils.deck_builder import build_decks as deck_builder, load_catalog_or_refresh
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,20 +23,33 @@ def build_players() -> List[Player]:
     ]
 
 
-def build_decks() -> Tuple[Deck, Deck, Deck]:
+def load_catalog() -> CardCatalog:
+    """
+    Load the card catalog from the local cache.
+    """
+    return load_catalog_or_refresh()
+
+def build_card_table(catalog: CardCatalog, registry: Optional[CardRegistry] = None) -> CardTable:
+    """
+    Create the per-game card table. Pass a registry to share it between games.
+    """
+    return CardTable(registry or catalog.registry())
+
+def build_decks(catalog: CardCatalog, cards: CardTable,
+                rng: Optional[random.Random] = None) -> Tuple[Deck, Deck, Deck]:
     """
     Build the three decks from the deck builder and wrap them
-    in our model Deck class.
+    in our model Deck class. Every physical card is added to `cards`.
     """
     logger.info("Building decks")
-    main, event, fan = deck_builder()
+    main, event, fan = deck_builder(catalog, cards, rng)
 
     main_deck = Deck(name=getattr(main, "name", "Main Deck"),
-                     cards=list(getattr(main, "cards", [])))
+                     cards=remaining_cards(main))
     event_deck = Deck(name=getattr(event, "name", "Event Deck"),
-                      cards=list(getattr(event, "cards", [])))
+                      cards=remaining_cards(event))
     fan_deck = Deck(name=getattr(fan, "name", "Fan Deck"),
-                    cards=list(getattr(fan, "cards", [])))
+                    cards=remaining_cards(fan))
 
     return main_deck, event_deck, fan_deck
 
@@ -42,11 +58,11 @@ def deal_starting_hands(players: List[Player], main_deck: Deck) -> None:
     Deal starting hands to players.
     """
     hand_size = GAME_CONFIG["starting_hand_size"]
-    logger.info(f"Dealing starting hands of size: {hand_size}")
+    logger.info("Dealing starting hands of size: %d", hand_size)
     for player in players:
         for _ in range(hand_size):
             card = draw_card(main_deck)
-            if card:
+            if card is not None:
                 player.hand.append(card)
 
 def engine_config() -> dict:
@@ -0,0 +1,264 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from engine.rules.event_ops import STATS
+
+# Per-game outcome records stored column by column, one flat file per
+# column, each a packed array of fixed-width rows in native byte order:
+#   winner       int8, -1 for a draw
+#   turns        uint16
+#   contests     uint16
+#   fans         uint16 per player
+#   stat_wins    uint16 per player per stat (STATS order)
+#   stars        a bitset per player of the star definition ids played
+# schema.json next to the columns records the widths, so a result set can
+# be opened and read without loading it into memory.
+
+SCHEMA_FILE = "schema.json"
+SCHEMA_VERSION = 1
+FLUSH_ROWS = 4096
+
+
+def result_columns(players: int, star_ids: int) -> Dict[str, Tuple[str, int]]:
+    """
+    Column name -> (array typecode, values per row).
+    """
+    return {
+        "winner": ("b", 1),
+        "turns": ("H", 1),
+        "contests": ("H", 1),
+        "fans": ("H", players),
+        "stat_wins": ("H", players * len(STATS)),
+        "stars": ("B", players * ((star_ids + 7) // 8)),
+    }
+
+
+def row_size(typecode: str, width: int) -> int:
+    """
+    Bytes one row takes in a column.
+    """
+    return array(typecode).itemsize * width
+
+
+def whole_rows(path: str, columns: Dict[str, Tuple[str, int]]) -> int:
+    """
+    Rows every column of the result set at `path` holds in full. A writer
+    killed mid-flush can leave some columns a row ahead.
+    """
+    row_counts = []
+    for name, (typecode, width) in columns.items():
+        column_path = os.path.join(path, f"{name}.bin")
+        size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+        row_counts.append(size // row_size(typecode, width))
+    return min(row_counts) if row_counts else 0
+
+
+class ResultBatch:
+    """
+    Outcome records packed into in-memory columns. Workers fill one per
+    shard and send it back to the process that owns the ResultWriter.
+    """
+
+    def __init__(self, players: int, star_ids: int):
+        self.players = players
+        self.star_ids = star_ids
+        self.columns = {name: array(typecode) for name, (typecode, _) in result_columns(players, star_ids).items()}
+        self._bitset_bytes = (star_ids + 7) // 8
+        self.rows = 0
+
+    def append(self, outcome: Any) -> None:
+        columns = self.columns
+        columns["winner"].append(-1 if outcome.winner is None else outcome.winner)
+        columns["turns"].append(outcome.turns)
+        columns["contests"].append(outcome.contests)
+        columns["fans"].extend(outcome.fans)
+        for wins in outcome.stat_wins:
+            columns["stat_wins"].extend(wins)
+        for stars in outcome.stars:
+            bitset = bytearray(self._bitset_bytes)
+            for definition_id in stars:
+                bitset[definition_id >> 3] |= 1 << (definition_id & 7)
+            columns["stars"].frombytes(bitset)
+        self.rows += 1
+
+    def clear(self) -> None:
+        for column in self.columns.values():
+            del column[:]
+        self.rows = 0
+
+
+class ResultWriter:
+    """
+    Appends outcome records to a result set directory, creating it on first
+    use. Rows are buffered and written every FLUSH_ROWS rows, on flush() and
+    on close(). A single writer owns the directory; workers hand their
+    ResultBatch to it through extend().
+    """
+
+    def __init__(self, path: str, players: int, star_ids: int):
+        self.path = path
+        self.batch = ResultBatch(players, star_ids)
+        schema = {
+            "version": SCHEMA_VERSION,
+            "byteorder": sys.byteorder,
+            "players": players,
+            "star_ids": star_ids,
+            "stats": list(STATS),
+            "columns": result_columns(players, star_ids),
+        }
+        os.makedirs(path, exist_ok=True)
+        schema_path = os.path.join(path, SCHEMA_FILE)
+        if os.path.exists(schema_path):
+            with open(schema_path, encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing != json.loads(json.dumps(schema)):
+                raise ValueError(f"{path} holds results with a different schema")
+            self._trim(schema["columns"])
+        else:
+            with open(schema_path, "w", encoding="utf-8") as f:
+                json.dump(schema, f, indent=2)
+
+    def _trim(self, columns: Dict[str, Tuple[str, int]]) -> None:
+        """
+        Cut every column back to the rows they all hold, so appends after a
+        torn flush line up again.
+        """
+        rows = whole_rows(self.path, columns)
+        for name, (typecode, width) in columns.items():
+            column_path = os.path.join(self.path, f"{name}.bin")
+            if os.path.exists(column_path) and os.path.getsize(column_path) > rows * row_size(typecode, width):
+                os.truncate(column_path, rows * row_size(typecode, width))
+
+    def append(self, outcome: Any) -> None:
+        self.batch.append(outcome)
+        if self.batch.rows >= FLUSH_ROWS:
+            self.flush()
+
+    def extend(self, batch: ResultBatch) -> None:
+        self.flush()
+        self._write(batch)
+
+    def flush(self) -> None:
+        if self.batch.rows:
+            self._write(self.batch)
+            self.batch.clear()
+
+    def _write(self, batch: ResultBatch) -> None:
+        for name, column in batch.columns.items():
+            with open(os.path.join(self.path, f"{name}.bin"), "ab") as f:
+                column.tofile(f)
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ResultSet:
+    """
+    Read-only view of a result set. Columns are memory-mapped, so opening
+    even a very large set costs nothing until rows are read, and only the
+    pages touched are loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, SCHEMA_FILE), encoding="utf-8") as f:
+            self.schema = json.load(f)
+        if self.schema["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {self.schema['byteorder']}-endian machine")
+        self.players = self.schema["players"]
+        self.stats = self.schema["stats"]
+        self._maps: Dict[str, Optional[mmap.mmap]] = {}
+        self._views: Dict[str, memoryview] = {}
+
+        self.rows = whole_rows(path, self.schema["columns"])
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def column(self, name: str) -> memoryview:
+        """
+        Flat view of a column: row i holds values [i * width, (i + 1) * width).
+        """
+        view = self._views.get(name)
+        if view is None:
+            typecode, width = self.schema["columns"][name]
+            size = self.rows * row_size(typecode, width)
+            if size == 0:
+                view = memoryview(array(typecode))
+            else:
+                with open(self._column_path(name), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[name] = mapped
+                view = memoryview(mapped)[:size].cast(typecode)
+            self._views[name] = view
+        return view
+
+    def numpy(self, name: str) -> Any:
+        """
+        The column as a (rows, width) numpy.memmap. Needs numpy installed.
+        """
+        import numpy
+
+        typecode, width = self.schema["columns"][name]
+        return numpy.memmap(self._column_path(name), dtype=numpy.dtype(typecode), mode="r",
+                            shape=(self.rows, width))
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        players, stats = self.players, len(self.stats)
+        winner = self.column("winner")[index]
+        stat_wins = self.column("stat_wins")[index * players * stats:(index + 1) * players * stats]
+        bitset_bytes = self.schema["columns"]["stars"][1] // players
+        stars_row = self.column("stars")[index * players * bitset_bytes:(index + 1) * players * bitset_bytes]
+        return {
+            "winner": None if winner < 0 else winner,
+            "turns": self.column("turns")[index],
+            "contests": self.column("contests")[index],
+            "fans": self.column("fans")[index * players:(index + 1) * players].tolist(),
+            "stat_wins": [
+                dict(zip(self.stats, stat_wins[p * stats:(p + 1) * stats].tolist()))
+                for p in range(players)
+            ],
+            "stars": [
+                _bitset_ids(stars_row[p * bitset_bytes:(p + 1) * bitset_bytes])
+                for p in range(players)
+            ],
+        }
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "ResultSet":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _bitset_ids(bitset: memoryview) -> List[int]:
+    return [
+        byte_index * 8 + bit
+        for byte_index, byte in enumerate(bitset)
+        if byte
+        for bit in range(8)
+        if byte >> bit & 1
+    ]
@@ -0,0 +1,204 @@
+import logging
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.events import EventTrace, sampled
+from engine.game_engine import GameEngine
+from engine.replay import ActionLog
+from engine.setup import build_players, build_card_table, build_decks, deal_starting_hands
+from engine.ai.random_policy import RandomPolicy
+from utils.card_loader import CardCatalog
+
+logger = logging.getLogger(__name__)
+
+QUIET_LOGGERS = ("engine", "utils")
+MASK64 = (1 << 64) - 1
+
+
+def derive_seed(seed: int, game_index: int) -> int:
+    """
+    Seed for one game of a run (splitmix64 of the run seed and game index),
+    so a game plays the same no matter which process or order it runs in.
+    """
+    z = (seed * 0x9E3779B97F4A7C15 + (game_index + 1) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+@contextmanager
+def quiet_logging(level: int = logging.WARNING):
+    """
+    Raise the engine loggers to `level` for the duration of the block.
+    """
+    loggers = [logging.getLogger(name) for name in QUIET_LOGGERS]
+    previous = [lg.level for lg in loggers]
+    for lg in loggers:
+        lg.setLevel(level)
+    try:
+        yield
+    finally:
+        for lg, old_level in zip(loggers, previous):
+            lg.setLevel(old_level)
+
+
+@dataclass
+class GameOutcome:
+    winner: Optional[int]
+    turns: int
+    contests: int
+    fans: List[int]
+    # Contests won per player, per stat, and the star definition ids each player played
+    stat_wins: List[List[int]] = field(default_factory=list)
+    stars: List[List[int]] = field(default_factory=list)
+
+
+@dataclass
+class SimulationResult:
+    games: int = 0
+    wins: List[int] = field(default_factory=list)
+    draws: int = 0
+    total_turns: int = 0
+    total_contests: int = 0
+
+    def add(self, outcome: GameOutcome) -> None:
+        if len(self.wins) < len(outcome.fans):
+            self.wins.extend([0] * (len(outcome.fans) - len(self.wins)))
+        self.games += 1
+        if outcome.winner is None:
+            self.draws += 1
+        else:
+            self.wins[outcome.winner] += 1
+        self.total_turns += outcome.turns
+        self.total_contests += outcome.contests
+
+    @property
+    def average_turns(self) -> float:
+        return self.total_turns / self.games if self.games else 0.0
+
+    def merge(self, other: "SimulationResult") -> None:
+        if len(self.wins) < len(other.wins):
+            self.wins.extend([0] * (len(other.wins) - len(self.wins)))
+        for i, wins in enumerate(other.wins):
+            self.wins[i] += wins
+        self.games += other.games
+        self.draws += other.draws
+        self.total_turns += other.total_turns
+        self.total_contests += other.total_contests
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "wins": list(self.wins),
+            "draws": self.draws,
+            "average_turns": self.average_turns,
+            "total_contests": self.total_contests,
+        }
+
+
+class SimulationRunner:
+    """
+    Plays complete games headlessly: no UI, no per-command snapshots and
+    no INFO logging. Game i of a run is seeded with derive_seed(seed, i), so
+    the same seed and catalog always give the same results. With `events`,
+    1 in `trace_every` games sends its game events there. With `profiler`
+    (a PhaseProfiler) every game's phases are timed into it.
+    """
+
+    def __init__(self, catalog: CardCatalog, seed: int = 0,
+                 policy_factory: Callable[[random.Random], Any] = RandomPolicy,
+                 events: Optional[EventTrace] = None, trace_every: int = 1,
+                 profiler: Optional[Any] = None):
+        self.catalog = catalog
+        self.registry = catalog.registry()
+        self.seed = seed
+        self.policy_factory = policy_factory
+        self.events = events
+        self.trace_every = trace_every
+        self.profiler = profiler
+
+    def new_game(self, rng: random.Random) -> GameEngine:
+        players = build_players()
+        cards = build_card_table(self.catalog, self.registry)
+        main_deck, event_deck, fan_deck = build_decks(self.catalog, cards, rng)
+        deal_starting_hands(players, main_deck)
+        return GameEngine(players=players, decks=(main_deck, event_deck, fan_deck), cards=cards)
+
+    def play_game(self, game_index: int, log: Optional[ActionLog] = None) -> GameOutcome:
+        """
+        Play one game; with `log` its commands are recorded for replay.
+        """
+        rng = random.Random(derive_seed(self.seed, game_index))
+        engine = self.new_game(rng)
+        if log is not None:
+            engine.record(log)
+        if self.events is not None and sampled(game_index, self.trace_every):
+            engine.trace(self.events, game_index)
+        if self.profiler is not None:
+            engine.profile(self.profiler)
+        policies = [self.policy_factory(rng) for _ in engine.state.players]
+
+        state = engine.state
+        while not state.game_over:
+            player_index = state.current_player
+            command = policies[player_index].choose(engine, player_index)
+            if not engine.apply(command):
+                raise RuntimeError(f"Policy chose an illegal command: {command}")
+
+        return GameOutcome(
+            winner=state.winner,
+            turns=state.turn,
+            contests=state.contests,
+            fans=state.fan_totals[:],
+            stat_wins=[wins[:] for wins in state.stat_wins],
+            stars=[[state.cards.definition_ids[star_id] for star_id in player.star_cards] for player in state.players],
+        )
+
+    def run(self, count: int, start: int = 0, records: Optional[Any] = None) -> SimulationResult:
+        """
+        Play games start .. start + count - 1 of this run. Every outcome is
+        also appended to `records` (a ResultBatch or ResultWriter) if given.
+        """
+        result = SimulationResult()
+        with quiet_logging():
+            for game_index in range(start, start + count):
+                outcome = self.play_game(game_index)
+                result.add(outcome)
+                if records is not None:
+                    records.append(outcome)
+        logger.info("Simulated %d games", result.games)
+        return result
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from engine.events import BinaryEventSink
+    from engine.profiling import PhaseProfiler
+    from utils.deck_builder import load_catalog_or_refresh
+
+    parser = argparse.ArgumentParser(description="Play Star Power games headlessly")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--events", help="file to append binary game events to")
+    parser.add_argument("--trace-every", type=int, default=100, help="trace 1 in this many games")
+    parser.add_argument("--profile", action="store_true", help="print time spent per engine phase")
+    parser.add_argument("--chrome-trace", help="with --profile, write a Chrome trace JSON here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    events = EventTrace([BinaryEventSink(args.events)]) if args.events else None
+    profiler = PhaseProfiler(chrome_trace=bool(args.chrome_trace)) if args.profile else None
+    runner = SimulationRunner(load_catalog_or_refresh(), seed=args.seed, events=events, trace_every=args.trace_every,
+                              profiler=profiler)
+    try:
+        print(json.dumps(runner.run(args.games).as_dict(), indent=2))
+    finally:
+        if events is not None:
+            events.close()
+    if profiler is not None:
+        print(profiler.format_summary())
+        if args.chrome_trace:
+            profiler.write_chrome_trace(args.chrome_trace)
@@ -0,0 +1,96 @@
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from engine.ai.random_policy import RandomPolicy
+from engine.simulation.results import ResultBatch, ResultWriter
+from engine.simulation.runner import SimulationRunner, SimulationResult
+from engine.setup import build_players
+from utils.card_loader import CardCatalog
+
+logger = logging.getLogger(__name__)
+
+# One runner per worker process, built once from the catalog by the pool initializer
+_worker_runner: Optional[SimulationRunner] = None
+_worker_records = False
+
+
+def _init_worker(catalog: CardCatalog, seed: int, policy_factory: Callable[[random.Random], Any],
+                 records: bool = False) -> None:
+    global _worker_runner, _worker_records
+    _worker_runner = SimulationRunner(catalog, seed=seed, policy_factory=policy_factory)
+    _worker_records = records
+
+
+def _run_shard(shard: Tuple[int, int]) -> Tuple[SimulationResult, Optional[ResultBatch]]:
+    start, count = shard
+    batch = None
+    if _worker_records:
+        batch = ResultBatch(len(build_players()), len(_worker_runner.registry))
+    return _worker_runner.run(count, start=start, records=batch), batch
+
+
+def shard_games(games: int, shard_size: int) -> List[Tuple[int, int]]:
+    """
+    Split game indices 0 .. games - 1 into (start, count) shards.
+    """
+    return [(start, min(shard_size, games - start)) for start in range(0, games, shard_size)]
+
+
+def run_tournament(catalog: CardCatalog, games: int, seed: int = 0,
+                   workers: Optional[int] = None, shard_size: int = 500,
+                   policy_factory: Callable[[random.Random], Any] = RandomPolicy,
+                   results_path: Optional[str] = None) -> SimulationResult:
+    """
+    Play `games` headless games across a process pool. Every game is seeded
+    from (seed, game index), so the result is identical for any worker count.
+    The policy factory must be picklable (a module-level class or function).
+    With `results_path`, every game's outcome record is appended, in game
+    order, to the result set there (see engine.simulation.results).
+    """
+    workers = workers or os.cpu_count() or 1
+    shards = shard_games(games, shard_size)
+    result = SimulationResult()
+    writer = None
+    if results_path is not None:
+        writer = ResultWriter(results_path, len(build_players()), len(catalog.all_cards()))
+
+    try:
+        if workers == 1:
+            runner = SimulationRunner(catalog, seed=seed, policy_factory=policy_factory)
+            for start, count in shards:
+                result.merge(runner.run(count, start=start, records=writer))
+            return result
+
+        logger.info("Running %d games on %d workers in %d shards", games, workers, len(shards))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(catalog, seed, policy_factory, writer is not None)) as pool:
+            for shard_result, batch in pool.map(_run_shard, shards):
+                result.merge(shard_result)
+                if writer is not None:
+                    writer.extend(batch)
+        return result
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from utils.deck_builder import load_catalog_or_refresh
+
+    parser = argparse.ArgumentParser(description="Play a Star Power tournament across a process pool")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=500)
+    parser.add_argument("--results", help="directory to append per-game outcome records to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    result = run_tournament(load_catalog_or_refresh(), args.games, seed=args.seed,
+                            workers=args.workers, shard_size=args.shard_size, results_path=args.results)
+    print(json.dumps(result.as_dict(), indent=2))
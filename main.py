@@ -1,19 +1,103 @@
+import argparse
+import json
 import logging
+import random
+from typing import Any, Dict, List, Optional
+
+from engine.events import BinaryEventSink, EventTrace, LoggingSink
 from engine.game_engine import GameEngine
-from engine.setup import build_players, build_decks, deal_starting_hands
-from ui.game_client import GameClient
+from engine.profiling import PhaseProfiler
+from engine.setup import build_players, load_catalog, build_card_table, build_decks, deal_starting_hands
+from engine.ai.mcts import MCTSPolicy
+from engine.ai.random_policy import RandomPolicy
+
+# The GUI (and dearpygui with it) is only imported when a window is opened,
+# so `--headless` runs, simulation workers and tests start with the engine alone.
+
+logger = logging.getLogger(__name__)
 
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-    logging.info("Launching Star Power")
 
+def new_game(rng: Optional[random.Random] = None) -> GameEngine:
     players = build_players()
-    main_deck, event_deck, fan_deck = build_decks()
+    catalog = load_catalog()
+    cards = build_card_table(catalog)
+    main_deck, event_deck, fan_deck = build_decks(catalog, cards, rng)
     deal_starting_hands(players, main_deck)
 
-    engine = GameEngine(
+    return GameEngine(
         players=players,
-        decks=(main_deck, event_deck, fan_deck)
+        decks=(main_deck, event_deck, fan_deck),
+        cards=cards
     )
 
-    GameClient(engine)
+
+def make_policy(name: str, rng: random.Random, budget_ms: float) -> Any:
+    if name == "random":
+        return RandomPolicy(rng)
+    return MCTSPolicy(rng, time_budget_ms=budget_ms)
+
+
+def play_headless(engine: GameEngine, policies: List[Any]) -> Dict[str, Any]:
+    """
+    Play the game to the end with one policy per seat and return its outcome.
+    """
+    state = engine.state
+    while not state.game_over:
+        player_index = state.current_player
+        command = policies[player_index].choose(engine, player_index)
+        if not engine.apply(command):
+            raise RuntimeError(f"Policy chose an illegal command: {command}")
+    return {
+        "winner": None if state.winner is None else state.players[state.winner].name,
+        "turns": state.turn,
+        "contests": state.contests,
+        "fans": {player.name: fans for player, fans in zip(state.players, state.fan_totals)},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Star Power")
+    parser.add_argument("--headless", action="store_true",
+                        help="play computer against computer without opening a window and print the result")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--player", choices=("mcts", "random"), default="mcts",
+                        help="policy for the first seat in a headless game")
+    parser.add_argument("--opponent", choices=("mcts", "random"), default="mcts")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="MCTS time budget per move")
+    parser.add_argument("--events", help="also append binary game events to this file")
+    parser.add_argument("--profile", action="store_true", help="print time spent per engine phase at the end")
+    parser.add_argument("--chrome-trace", help="with --profile, write a Chrome trace JSON here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING if args.headless else logging.INFO,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.info("Launching Star Power")
+
+    rng = random.Random(args.seed)
+    engine = new_game(rng)
+    opponent = make_policy(args.opponent, rng, args.budget_ms)
+    sinks = [] if args.headless else [LoggingSink()]
+    if args.events:
+        sinks.append(BinaryEventSink(args.events))
+    if sinks:
+        engine.trace(EventTrace(sinks))
+    if args.profile:
+        engine.profile(PhaseProfiler(chrome_trace=bool(args.chrome_trace)))
+
+    if args.headless:
+        policies = [make_policy(args.player, rng, args.budget_ms)]
+        policies += [opponent] * (len(engine.state.players) - 1)
+        print(json.dumps(play_headless(engine, policies), indent=2))
+    else:
+        from ui.game_client import GameClient
+        GameClient(engine, opponent=opponent)
+    if engine.events is not None:
+        engine.events.close()
+    if engine.profiler is not None:
+        print(engine.profiler.format_summary())
+        if args.chrome_trace:
+            engine.profiler.write_chrome_trace(args.chrome_trace)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,189 @@
 import dearpygui.dearpygui as dpg
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
 class GameClient:
-    def __init__(self, game):
+    def __init__(self, game, opponent=None):
+        """
+        opponent: optional AI policy (e.g. MCTSPolicy) that plays every
+        player other than player 0 whenever it is their turn. Its search
+        runs on a worker thread; the frame loop applies the move it picks.
+        """
         logger.info("Initializing GameClient")
         self.game = game
+        self.opponent = opponent
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.opponent_move = None
         dpg.create_context()
         dpg.create_viewport(title="Star Power", width=1025, height=900)
         self.setup_ui()
         self.state = self.game.snapshot()
         dpg.setup_dearpygui()
+        self.start_opponent_move()
         self.refresh_zones()
         dpg.show_viewport()
-        dpg.start_dearpygui()
+        while dpg.is_dearpygui_running():
+            self.poll_opponent()
+            dpg.render_dearpygui_frame()
+        self.executor.shutdown(wait=False, cancel_futures=True)
         dpg.destroy_context()
 
     def setup_ui(self):
+        # Rows of card widgets, keyed by card id: {row tag: {card id: (item, view)}}
+        self.card_items = {"opponent_stars": {}, "user_stars": {}, "hand_row": {}}
+        self.controls_key = None
+
         with dpg.window(label="Star Power", tag="root", width=1000, height=900, no_resize=True, no_move=True):
             # Top row: Deck (left) + Board (right)
             with dpg.group(horizontal=True):
                 with dpg.child_window(tag="deck_zone", width=200, height=580, border=True):
-                    pass
+                    dpg.add_text("", tag="main_deck_text")
+                    dpg.add_text("", tag="event_deck_text")
+                    dpg.add_text("", tag="fan_deck_text")
+                    dpg.add_spacer(height=10)
+                    dpg.add_text("", tag="turn_text")
+                    dpg.add_group(tag="controls")
                 with dpg.child_window(tag="board_zone", width=-1, height=580, border=True):
-                    pass
+                    dpg.add_text("Board:")
+                    dpg.add_text("", tag="opponent_stars_text")
+                    dpg.add_group(tag="opponent_stars", horizontal=True)
+                    dpg.add_spacer(height=10)
+                    dpg.add_text("", tag="user_stars_text")
+                    dpg.add_group(tag="user_stars", horizontal=True)
             # Bottom row: Hand
             with dpg.child_window(tag="hand_zone", height=230, border=True):
-                pass
+                dpg.add_text("", tag="hand_text")
+                dpg.add_text("(empty)", tag="hand_empty_text")
+                dpg.add_group(tag="hand_row", horizontal=True)
 
-    
     def refresh_zones(self):
+        """
+        Bring the widgets in line with the current snapshot. Widgets are kept
+        between refreshes and only the cards and controls that changed are
+        added, removed or rebuilt.
+        """
         self.state = self.game.snapshot()
 
-        # Clear zones
-        for zone in ("deck_zone", "hand_zone", "board_zone"):
-            for child in dpg.get_item_children(zone, 1) or []:
-                dpg.delete_item(child)
-
-
         # Player State
         players = self.state["players"]
         user_view = self.state["players"][0]
         opponent_view = self.state["players"][1]
-        
 
         # Deck
-        main_deck_view = self.state.get("main_deck")
-        event_deck_view = self.state.get("event_deck")
-        fan_deck_view = self.state.get("fan_deck")
-        if main_deck_view:
-            dpg.add_text(
-                f"{main_deck_view.get('name','Main Deck')} ({main_deck_view.get('size') or main_deck_view.get('count', 0)} cards)",
-                parent="deck_zone"
-            )
-        if event_deck_view:
-            dpg.add_text(
-                f"{event_deck_view.get('name','Event Deck')} ({event_deck_view.get('size') or event_deck_view.get('count', 0)} cards)",
-                parent="deck_zone"
-            )
-        if fan_deck_view:
-            dpg.add_text(
-                f"{fan_deck_view.get('name','Fan Deck')} ({fan_deck_view.get('size') or fan_deck_view.get('count', 0)} cards)",
-                parent="deck_zone"
-            )
-        if not any([main_deck_view, event_deck_view, fan_deck_view]):
-            dpg.add_text("Decks unavailable", parent="deck_zone")
-
+        for key, default in (("main_deck", "Main Deck"), ("event_deck", "Event Deck"), ("fan_deck", "Fan Deck")):
+            deck_view = self.state.get(key) or {}
+            dpg.set_value(f"{key}_text", f"{deck_view.get('name', default)} ({deck_view.get('size', 0)} cards)")
+        thinking = " (opponent is thinking)" if self.opponent_move is not None else ""
+        dpg.set_value("turn_text", f"Turn {self.state.get('turn', 1)}{thinking}")
+        self._sync_controls(players)
 
         # Board
-        dpg.add_text("Board:", parent="board_zone")
-        
-        dpg.add_text(f"{opponent_view.get('name','Opponent')}'s Stars:", parent="board_zone")
-        opp_board_row = dpg.add_group(horizontal=True, parent="board_zone")
-        
-        for card_view in (opponent_view.get("stars", []) or []):
-            self.display_card(card_view, parent=opp_board_row)
-
-        dpg.add_spacer(height=10, parent="board_zone")
-        dpg.add_text(f"{user_view.get('name','You')}'s Stars:", parent="board_zone")
-
-        user_board_row = dpg.add_group(horizontal=True, parent="board_zone")
-        
-        for card_view in (user_view.get("stars", []) or []):
-            self.display_card(card_view, parent=user_board_row)
-
+        dpg.set_value("opponent_stars_text", f"{opponent_view.get('name','Opponent')}'s Stars:")
+        dpg.set_value("user_stars_text", f"{user_view.get('name','You')}'s Stars:")
+        self._sync_row("opponent_stars", opponent_view.get("stars", []) or [])
+        self._sync_row("user_stars", user_view.get("stars", []) or [])
 
         # Hand
-        user_name = user_view.get("name", "Player")
-        dpg.add_text(f"{user_name}'s Hand:", parent="hand_zone")
-        hand_row = dpg.add_group(horizontal=True, parent="hand_zone", tag="hand_row")
         user_hand_cards = user_view.get("hand", []) or []
-        if user_hand_cards:
-            for card_view in user_hand_cards:
-                self.display_card(card_view, parent=hand_row)
-        else:
-            dpg.add_text("(empty)", parent=hand_row)
+        dpg.set_value("hand_text", f"{user_view.get('name', 'Player')}'s Hand:")
+        dpg.configure_item("hand_empty_text", show=not user_hand_cards)
+        self._sync_row("hand_row", user_hand_cards)
+
+    def _sync_controls(self, players):
+        """
+        Turn controls only change when the turn, pending event or result
+        does, so they are rebuilt only then.
+        """
+        state = self.state
+        key = (state.get("game_over"), state.get("winner"), state.get("current_player"),
+               state.get("pending_event"), tuple(state.get("pending_stat_options", [])))
+        if key == self.controls_key:
+            return
+        self.controls_key = key
+        dpg.delete_item("controls", children_only=True)
+
+        if state.get("game_over"):
+            winner = state.get("winner")
+            result = "Draw" if winner is None else f"{players[winner].get('name', 'Player')} wins!"
+            dpg.add_text(f"Game over: {result}", parent="controls")
+        elif state.get("current_player") == 0:
+            if state.get("pending_event"):
+                dpg.add_text(f"{state['pending_event']}: choose a stat", parent="controls", wrap=180)
+                for stat in state.get("pending_stat_options", []):
+                    dpg.add_button(
+                        label=stat.capitalize(),
+                        parent="controls",
+                        callback=self._card_button_callback,
+                        user_data={"type": "CHOOSE_STAT", "payload": {"player": 0, "stat": stat}},
+                    )
+            else:
+                dpg.add_button(
+                    label="End Turn",
+                    parent="controls",
+                    callback=self._card_button_callback,
+                    user_data={"type": "END_TURN", "payload": {"player": 0}},
+                )
 
+    def _sync_row(self, row, card_views):
+        """
+        Keyed update of one row of cards: drop the cards that left, build the
+        ones that arrived or whose view changed, then fix the order.
+        """
+        items = self.card_items[row]
+        wanted = {card_view["id"] for card_view in card_views}
+        for card_id in [card_id for card_id in items if card_id not in wanted]:
+            dpg.delete_item(items.pop(card_id)[0])
+
+        for card_view in card_views:
+            entry = items.get(card_view["id"])
+            if entry is not None and entry[1] == card_view:
+                continue
+            if entry is not None:
+                dpg.delete_item(entry[0])
+            items[card_view["id"]] = (self.display_card(card_view, parent=row), card_view)
+
+        order = [items[card_view["id"]][0] for card_view in card_views]
+        if list(dpg.get_item_children(row, 1) or []) != order:
+            # Moving an item without `before` appends it, so this rebuilds the order
+            for item in order:
+                dpg.move_item(item, parent=row)
 
     def on_card_action(self, command: dict) -> None:
+        if self.opponent_move is not None:
+            # Ignore clicks until the opponent's move has been applied
+            return
         self.game.dispatch(command)
+        self.start_opponent_move()
+        self.refresh_zones()
+
+    def start_opponent_move(self) -> None:
+        """
+        Start the opponent's search if it is their turn. The search runs on
+        a clone, so the UI can keep reading the game while it thinks.
+        """
+        state = self.game.state
+        if self.opponent is None or state.game_over or state.current_player == 0:
+            return
+        self.opponent_move = self.executor.submit(
+            self.opponent.choose, self.game.clone(), state.current_player)
+
+    def poll_opponent(self) -> None:
+        """
+        Called every frame: once the opponent's search is done, apply its
+        command on this thread and start the next search if it is still
+        their turn.
+        """
+        move = self.opponent_move
+        if move is None or not move.done():
+            return
+        self.opponent_move = None
+        command = move.result()
+        if self.game.apply(command):
+            self.start_opponent_move()
+        else:
+            logger.info("Opponent chose an illegal command: %s", command)
         self.refresh_zones()
 
     def _card_button_callback(self, sender, app_data, user_data):
@@ -109,7 +193,7 @@ class GameClient:
             self, 
             card_view, 
             parent):
-        with dpg.child_window(parent=parent, width=120, height=180, border=True):
+        with dpg.child_window(parent=parent, width=120, height=180, border=True) as card:
             dpg.add_text(card_view.get("name", "Card"))
             dpg.add_spacer(height=5)
 
@@ -125,18 +209,22 @@ class GameClient:
 
             if card_view.get("show_button", False):
                 dpg.add_spacer(height=10)
-                dpg.add_button(
-                    label=card_view.get("button_label", "Play"),
-                    enabled=True,
-                    callback=self._card_button_callback,
-                    user_data=card_view.get("button_command", "Play"),
-                )
+                for button in card_view.get("buttons", []):
+                    dpg.add_button(
+                        label=button.get("label", "Play"),
+                        enabled=True,
+                        callback=self._card_button_callback,
+                        user_data=button["command"],
+                    )
+        return card
     
     def _render_star_card(self, card_view):
         dpg.add_text(f"Aura: {card_view.get('aura', 0)}")
         dpg.add_text(f"Influence: {card_view.get('influence', 0)}")
         dpg.add_text(f"Talent: {card_view.get('talent', 0)}")
         dpg.add_text(f"Legacy: {card_view.get('legacy', 0)}")
+        if card_view.get("fans") or card_view.get("powers"):
+            dpg.add_text(f"Fans: {card_view.get('fans', 0)}  Powers: {card_view.get('powers', 0)}")
 
     def _render_power_card(self, card_view):
         # desc = (card_view.get("description") or "").strip() or "(Power)"
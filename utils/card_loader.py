@@ -1,6 +1,12 @@
-from typing import List
-import uuid
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import logging
+import os
+from engine.models.registry import CardRegistry
 from engine.models.cards import (
+    STATS,
     StarCard,
     StatContestEvent,
     FanCard,
@@ -8,28 +14,56 @@ from engine.models.cards import (
     ModifyStatCard,       # optional
 )
 
-def _new_id():
-    return str(uuid.uuid4())
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+CATALOG_CACHE_PATH = os.path.join(PROJECT_ROOT, "resources", "card_catalog.json")
+CATALOG_CACHE_VERSION = 1
+CATALOG_SHEETS = ("Star Cards", "Power Cards", "Event Cards", "Fan Cards")
 
-def load_star_cards(sheet):
+logger = logging.getLogger(__name__)
+
+class CatalogCacheError(Exception):
+    pass
+
+@dataclass
+class CardCatalog:
+    """
+    Every card definition available to deck building, grouped by sheet.
+    """
+    star_cards: List[StarCard] = field(default_factory=list)
+    power_cards: List[PowerCard] = field(default_factory=list)
+    event_cards: List[StatContestEvent] = field(default_factory=list)
+    fan_cards: List[FanCard] = field(default_factory=list)
+
+    def all_cards(self) -> List[Any]:
+        return self.star_cards + self.power_cards + self.event_cards + self.fan_cards
+
+    def registry(self) -> CardRegistry:
+        """
+        Registry of every definition, ordered by id.
+        """
+        return CardRegistry(sorted(self.all_cards(), key=lambda card: card.id))
+
+def load_star_cards(sheet, ids: Optional[Iterator[int]] = None):
+    ids = ids or count()
     rows = sheet.get_all_records()
     stars = []
 
     for row in rows:
         stars.append(
             StarCard(
-                id=_new_id(),
+                id=next(ids),
                 name=row["Name"],
                 aura=int(row["Aura"]),
                 talent=int(row["Talent"]),
                 influence=int(row["Influence"]),
                 legacy=int(row["Legacy"]),
-                tags=[t.strip() for t in row.get("Tags", "").split(",") if t.strip()]
+                tags=tuple(t.strip() for t in row.get("Tags", "").split(",") if t.strip())
             )
         )
     return stars
 
-def load_power_cards(sheet):
+def load_power_cards(sheet, ids: Optional[Iterator[int]] = None):
+    ids = ids or count()
     rows = sheet.get_all_records()
     powers = []
 
@@ -37,48 +71,123 @@ def load_power_cards(sheet):
         if row.get("Type") == "Modify Stat":
             powers.append(
                 ModifyStatCard(
-                    id=_new_id(),
+                    id=next(ids),
                     name=row.get("Name", "Unnamed Power"),
                     description=row.get("Description", ""),
                     targets_star=True,
-                    stat_modifiers={
-                        "aura": int(row.get("Aura Mod", 0)),
-                        "talent": int(row.get("Talent Mod", 0)),
-                        "influence": int(row.get("Influence Mod", 0)),
-                        "legacy": int(row.get("Legacy Mod", 0)),
-                        }
+                    stat_modifiers=(
+                        ("aura", int(row.get("Aura Mod", 0))),
+                        ("talent", int(row.get("Talent Mod", 0))),
+                        ("influence", int(row.get("Influence Mod", 0))),
+                        ("legacy", int(row.get("Legacy Mod", 0))),
+                        )
                     )
             )
         else:
             pass  # Skip unsupported power card types for now
     return powers
 
-def load_event_cards(sheet):
+def load_event_cards(sheet, ids: Optional[Iterator[int]] = None):
+    ids = ids or count()
     rows = sheet.get_all_records()
     events = []
     for row in rows:
         if row.get("Type") == "Stat Contest":
+            stat_options = tuple(s.strip().lower() for s in str(row.get("Stat Options", "")).split(","))
+            unknown = [stat for stat in stat_options if stat not in STATS]
+            if unknown:
+                # The engine indexes contests by stat, so a bad option would only fail mid-game
+                logger.warning("Skipping event card %r: unknown stat options %s", row.get("Name"), unknown)
+                continue
             events.append(
                 StatContestEvent(
-                    id=_new_id(),
+                    id=next(ids),
                     name=row["Name"], 
-                    stat_options=[s.strip() for s in row["Stat Options"].split(",")]
+                    stat_options=stat_options
                     )
                 )
         else:
             print(f"Skipping unknown event type: {row}")
     return events
 
-def load_fan_cards(sheet):
+def load_fan_cards(sheet, ids: Optional[Iterator[int]] = None):
+    ids = ids or count()
     rows = sheet.get_all_records()
     fans = []
     for row in rows:
         fans.append(
             FanCard(
-                id=_new_id(),
+                id=next(ids),
                 name=row.get("Name"),
                 bonus=int(row.get("Bonus")),
                 tag=row.get("Tag") or None
             )
         )
-    return fans
\ No newline at end of file
+    return fans
+
+def load_catalog(spreadsheet) -> CardCatalog:
+    """
+    Load the full card catalog from the four worksheets of the spreadsheet.
+    Definition ids run from 0 across all four sheets.
+    """
+    ids = count()
+    return CardCatalog(
+        star_cards=load_star_cards(spreadsheet.worksheet("Star Cards"), ids),
+        power_cards=load_power_cards(spreadsheet.worksheet("Power Cards"), ids),
+        event_cards=load_event_cards(spreadsheet.worksheet("Event Cards"), ids),
+        fan_cards=load_fan_cards(spreadsheet.worksheet("Fan Cards"), ids),
+    )
+
+class CachedWorksheet:
+    """
+    Stands in for a gspread worksheet, serving rows from the local cache.
+    """
+    def __init__(self, title: str, rows: List[Dict[str, Any]]):
+        self.title = title
+        self.rows = rows
+
+    def get_all_records(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+class CachedSpreadsheet:
+    def __init__(self, sheets: Dict[str, List[Dict[str, Any]]]):
+        self.sheets = sheets
+
+    def worksheet(self, title: str) -> CachedWorksheet:
+        if title not in self.sheets:
+            raise CatalogCacheError(f"Worksheet missing from catalog cache: {title}")
+        return CachedWorksheet(title, self.sheets[title])
+
+def write_catalog_cache(sheets: Dict[str, List[Dict[str, Any]]], path: str = CATALOG_CACHE_PATH, source: str = "") -> None:
+    """
+    Write raw worksheet rows to the cache. The file is replaced atomically.
+    """
+    data = {"version": CATALOG_CACHE_VERSION, "source": source, "sheets": sheets}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def read_catalog_cache(path: str = CATALOG_CACHE_PATH) -> CachedSpreadsheet:
+    if not os.path.exists(path):
+        raise CatalogCacheError(f"No card catalog cache at {path}")
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise CatalogCacheError(f"Card catalog cache at {path} is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise CatalogCacheError(f"Card catalog cache at {path} is not a catalog")
+    if data.get("version") != CATALOG_CACHE_VERSION:
+        raise CatalogCacheError(
+            f"Card catalog cache is version {data.get('version')}, expected {CATALOG_CACHE_VERSION}"
+        )
+    if not isinstance(data.get("sheets"), dict):
+        raise CatalogCacheError(f"Card catalog cache at {path} has no worksheets")
+    return CachedSpreadsheet(data["sheets"])
+
+def load_cached_catalog(path: str = CATALOG_CACHE_PATH) -> CardCatalog:
+    """
+    Load the card catalog from the local cache, with no network access.
+    """
+    return load_catalog(read_catalog_cache(path))
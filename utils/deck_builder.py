@@ -1,50 +1,61 @@
 import random
 import logging
+from typing import Optional
 from engine.models.deck import Deck
+from engine.models.registry import CardTable
 from engine.rules.deck_ops import shuffle_deck
 
-from utils.card_loader import load_star_cards, load_power_cards, load_event_cards, load_fan_cards
-from utils.google_client import google_sheets_client
+from utils.card_loader import (
+    CATALOG_CACHE_PATH,
+    CATALOG_SHEETS,
+    CardCatalog,
+    CatalogCacheError,
+    load_cached_catalog,
+    write_catalog_cache,
+)
 from resources.config import GOOGLE_SPREADSHEET_ID, GAME_CONFIG
 
 logger = logging.getLogger(__name__)
 
-def build_main_deck_from_sheet(star_sheet, power_sheet):
-    star_cards = load_star_cards(star_sheet)
-    power_cards = load_power_cards(power_sheet)
+def build_main_deck(star_cards, power_cards, cards: CardTable, rng: Optional[random.Random] = None):
+    rng = rng or random
     total_star_cards = GAME_CONFIG["main_deck_composition"]["star_cards"]
     total_power_cards = GAME_CONFIG["main_deck_composition"]["power_cards"]
-    picked_star_cards = random.sample(star_cards, k=min(total_star_cards, len(star_cards)))
+    picked_star_cards = [
+        cards.add(card.id)
+        for card in rng.sample(star_cards, k=min(total_star_cards, len(star_cards)))
+    ]
     picked_power_cards = []
     for card in power_cards:
-        picked_power_cards.extend([card] * total_power_cards)
+        picked_power_cards.extend(cards.add_copies(card.id, total_power_cards))
     picked_cards = picked_star_cards + picked_power_cards
     deck = Deck(name="Main Deck", cards=picked_cards)
-    shuffle_deck(deck)
+    shuffle_deck(deck, rng)
     return deck
 
-def build_event_deck_from_sheet(sheet):
-    event_cards = load_event_cards(sheet)
-
+def build_event_deck(event_cards, cards: CardTable, rng: Optional[random.Random] = None):
+    rng = rng or random
     single_stat = [event for event in event_cards if len(event.stat_options) == 1]
     double_stat = [event for event in event_cards if len(event.stat_options) == 2]
     quad_stat = [event for event in event_cards if len(event.stat_options) == 4]
 
     event_config = GAME_CONFIG["event_deck_composition"]
 
-    combined_cards = (
-        single_stat * event_config["single_stat_contest"]
-        + double_stat * event_config["double_stat_contest"]
-        + quad_stat * event_config["quad_stat_contest"]
-    )
+    combined_cards = []
+    for events, copies in (
+        (single_stat, event_config["single_stat_contest"]),
+        (double_stat, event_config["double_stat_contest"]),
+        (quad_stat, event_config["quad_stat_contest"]),
+    ):
+        for _ in range(copies):
+            combined_cards.extend(cards.add(event.id) for event in events)
 
-    random.shuffle(combined_cards)
     deck = Deck(name="Event Deck", cards=combined_cards)
-    shuffle_deck(deck)
+    shuffle_deck(deck, rng)
     return deck
 
-def build_fan_deck_from_sheet(sheet):
-    fan_cards = load_fan_cards(sheet)
+def build_fan_deck(fan_cards, cards: CardTable, rng: Optional[random.Random] = None):
+    rng = rng or random
     fan_config = GAME_CONFIG["fan_deck_composition"]
 
     tag_fans = [fan for fan in fan_cards if fan.bonus == 1 and fan.tag]
@@ -54,34 +65,60 @@ def build_fan_deck_from_sheet(sheet):
 
     deck_cards = []
     for fan in tag_fans:
-        deck_cards.extend([fan] * fan_config["tag_fans"])
+        deck_cards.extend(cards.add_copies(fan.id, fan_config["tag_fans"]))
     for superfan in tag_superfans:
-        deck_cards.extend([superfan] * fan_config["tag_superfans"])
+        deck_cards.extend(cards.add_copies(superfan.id, fan_config["tag_superfans"]))
     for fan in generic_fans:
-        deck_cards.extend([fan] * fan_config["generic_fans"])
+        deck_cards.extend(cards.add_copies(fan.id, fan_config["generic_fans"]))
     for superfan in generic_superfans:
-        deck_cards.extend([superfan] * fan_config["generic_superfans"])
+        deck_cards.extend(cards.add_copies(superfan.id, fan_config["generic_superfans"]))
 
-    random.shuffle(deck_cards)
     deck = Deck(name="Fan Deck", cards=deck_cards)
-    shuffle_deck(deck)
+    shuffle_deck(deck, rng)
     return deck
 
-def build_decks():
-    logger.info("Accessing Google Sheets client")
-    client = google_sheets_client()
-    spreadsheet = client.open_by_key(GOOGLE_SPREADSHEET_ID)
-    star_sheet = spreadsheet.worksheet("Star Cards")
-    power_sheet = spreadsheet.worksheet("Power Cards")
-    event_sheet = spreadsheet.worksheet("Event Cards")
-    fan_sheet = spreadsheet.worksheet("Fan Cards")
-
-    logger.info("Loading main, event, and fan decks from Google Sheets")
-    main_deck = build_main_deck_from_sheet(star_sheet, power_sheet)
-    logger.info("Main deck built with %d cards", len(main_deck.cards))
-    event_deck = build_event_deck_from_sheet(event_sheet)
-    logger.info("Event deck built with %d cards", len(event_deck.cards))
-    fan_deck = build_fan_deck_from_sheet(fan_sheet)
-    logger.info("Fan deck built with %d cards", len(fan_deck.cards))
+def build_decks_from_catalog(catalog: CardCatalog, cards: CardTable, rng: Optional[random.Random] = None):
+    """
+    Build fresh main, event and fan decks from an already loaded catalog,
+    adding every physical card to the game's card table.
+    """
+    main_deck = build_main_deck(catalog.star_cards, catalog.power_cards, cards, rng)
+    event_deck = build_event_deck(catalog.event_cards, cards, rng)
+    fan_deck = build_fan_deck(catalog.fan_cards, cards, rng)
+    return main_deck, event_deck, fan_deck
+
+def refresh_catalog_cache(path: str = CATALOG_CACHE_PATH, spreadsheet=None) -> None:
+    """
+    Pull every worksheet from Google Sheets once, concurrently, and rewrite
+    the local cache. Pass a spreadsheet stand-in to refresh without gspread.
+    """
+    from utils.google_client import google_sheets_client, fetch_worksheets
+
+    if spreadsheet is None:
+        logger.info("Accessing Google Sheets client")
+        client = google_sheets_client()
+        spreadsheet = client.open_by_key(GOOGLE_SPREADSHEET_ID)
+    sheets = fetch_worksheets(spreadsheet, CATALOG_SHEETS)
+    write_catalog_cache(sheets, path, source=GOOGLE_SPREADSHEET_ID)
+    logger.info("Card catalog cache written to %s", path)
+
+def load_catalog_or_refresh(path: str = CATALOG_CACHE_PATH) -> CardCatalog:
+    """
+    Read the local catalog cache, refreshing it from Sheets only when it is
+    missing or from an older cache version.
+    """
+    try:
+        return load_cached_catalog(path)
+    except CatalogCacheError as e:
+        logger.info("%s, refreshing from Google Sheets", e)
+        refresh_catalog_cache(path)
+        return load_cached_catalog(path)
+
+def build_decks(catalog: CardCatalog, cards: CardTable, rng: Optional[random.Random] = None):
+    logger.info("Loading main, event, and fan decks from the card catalog")
+    main_deck, event_deck, fan_deck = build_decks_from_catalog(catalog, cards, rng)
+    logger.info("Main deck built with %d cards", len(main_deck))
+    logger.info("Event deck built with %d cards", len(event_deck))
+    logger.info("Fan deck built with %d cards", len(fan_deck))
 
     return main_deck, event_deck, fan_deck
@@ -1,8 +1,29 @@
-import gspread
+import logging
 import os
-from google.oauth2.service_account import Credentials
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# gspread and google-auth are only imported once a Sheets call is made, so
+# anything that just builds games from the local cache starts without them.
+
+def retryable_errors() -> Tuple[Type[BaseException], ...]:
+    """
+    Errors worth retrying a fetch on; gspread's APIError when it is installed.
+    """
+    try:
+        import gspread
+    except ImportError:
+        return (ConnectionError, TimeoutError)
+    return (gspread.exceptions.APIError, ConnectionError, TimeoutError)
 
 def google_sheets_client():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
     SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
     PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
     SERVICE_ACCOUNT_PATH = os.path.join(PROJECT_ROOT, "resources", "google_service_account.json")
@@ -12,4 +33,33 @@ def google_sheets_client():
         scopes=SCOPES
     )
     client = gspread.authorize(credentials)
-    return client
\ No newline at end of file
+    return client
+
+def fetch_records(spreadsheet, title: str, retries: int = 3, backoff: float = 0.5,
+                  retry_on: Optional[Tuple[Type[BaseException], ...]] = None) -> List[Dict[str, Any]]:
+    """
+    get_all_records() for one worksheet, retrying with exponential backoff.
+    """
+    retry_on = retry_on or retryable_errors()
+    for attempt in range(retries + 1):
+        try:
+            return spreadsheet.worksheet(title).get_all_records()
+        except retry_on as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            logger.info("Fetching %s failed (%s), retrying in %.2fs", title, e, delay)
+            time.sleep(delay)
+
+def fetch_worksheets(spreadsheet, titles: Sequence[str], retries: int = 3, backoff: float = 0.5,
+                     retry_on: Optional[Tuple[Type[BaseException], ...]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch every worksheet's records at once, one thread per sheet, so the
+    total time is that of the slowest sheet. Any object with
+    worksheet(title).get_all_records() works in place of a gspread spreadsheet.
+    """
+    retry_on = retry_on or retryable_errors()
+    with ThreadPoolExecutor(max_workers=len(titles) or 1) as pool:
+        futures = {title: pool.submit(fetch_records, spreadsheet, title, retries, backoff, retry_on)
+                   for title in titles}
+        return {title: future.result() for title, future in futures.items()}
@@ -0,0 +1,12 @@
+import argparse
+import logging
+from utils.card_loader import CATALOG_CACHE_PATH
+from utils.deck_builder import refresh_catalog_cache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pull the card catalog from Google Sheets into the local cache")
+    parser.add_argument("--path", default=CATALOG_CACHE_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    refresh_catalog_cache(args.path)